@@ -41,7 +41,8 @@ def procesar_excel_y_zip(uploaded_file):
     total_equipos = 0
     total_imagenes = 0
 
-    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
+    # Los PNG ya vienen comprimidos: se guardan sin DEFLATE
+    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_STORED) as zip_file:
         
         # Iteramos por cada fila (cada equipo)
         for index, row in df.iterrows():
@@ -133,7 +133,8 @@ if st.session_state.equipos_data:
         
         if st.button("Generar ZIP"):
             zip_buffer = io.BytesIO()
-            with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
+            # Los PNG ya vienen comprimidos: se guardan sin DEFLATE
+            with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_STORED) as zip_file:
                 for equipo in datos:
                     for img in equipo["Imagenes"]:
                         # Ruta: CarpetaEquipo/Archivo.png
@@ -252,7 +252,8 @@ if st.session_state.df_original is not None:
         st.subheader("2. QRs (ZIP)")
         if st.button("Generar ZIP de QRs"):
             b = io.BytesIO()
-            with zipfile.ZipFile(b, "w", zipfile.ZIP_DEFLATED) as z:
+            # Los PNG ya vienen comprimidos: se guardan sin DEFLATE
+            with zipfile.ZipFile(b, "w", zipfile.ZIP_STORED) as z:
                 for eq in datos_equipos:
                     for img in eq["Imagenes"]:
                         z.writestr(f"{eq['Carpeta']}/{img['nombre_archivo']}", img['bytes'])
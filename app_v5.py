@@ -1,129 +1,108 @@
 import streamlit as st
-import pandas as pd
-import qrcode
-import io
-import zipfile
-import smtplib
-from email.message import EmailMessage
-import time
-import xlsxwriter
 import os
+import time
+
+from registro.almacen import obtener_almacen
+from registro.cache_qr import obtener_cache
+from registro.correo import CONEXIONES_DEFECTO, LIMITES, PROVEEDORES, duracion_estimada
+from registro.exportar import MODOS_ZIP, escribir_zip
+from registro.metricas import RUTA_LOG, medir, recientes
+from registro.paquetes import ADJUNTOS, agrupar_por_coach
+from registro.pipeline import ASUNTO_DEFECTO, CUERPO_DEFECTO, cargar_torneo, con_correo, huella_archivo
+from registro.qr import NOMBRES_PERFIL, contar_datos
+from registro.reporte import contar_asesores, generar_excel_resumen
+from registro.roster import leer_equipos
+from registro.trabajos import obtener_cola
+from registro.versiones import obtener_historial
 
 # Configuración de la página
 st.set_page_config(page_title="Sistema de Registro", page_icon="🎓", layout="wide")
 
 # --- FUNCIONES AUXILIARES Y DE LÓGICA (Sin cambios) ---
 
-def limpiar_dato(dato):
-    if pd.isna(dato): return ""
-    txt = str(dato).strip()
-    return txt[:-2] if txt.endswith(".0") else txt
+ORIGENES = {"almacen": "almacén compartido del servidor", "archivo": "leído y procesado"}
 
-def generar_qr_bytes(dato):
-    qr = qrcode.QRCode(box_size=10, border=4)
-    qr.add_data(dato)
-    qr.make(fit=True)
-    img = qr.make_image(fill_color="black", back_color="white")
-    img_byte_arr = io.BytesIO()
-    img.save(img_byte_arr, format='PNG')
-    return img_byte_arr.getvalue()
+def procesar_archivo(contenido):
+    """Lee, normaliza y guarda el Excel en el almacén si es la primera vez que se ve.
 
-def cargar_dataframe(uploaded_file):
+    Regresa de dónde salieron los datos, o None si el archivo no se pudo leer.
+    """
     try:
-        df = pd.read_excel(uploaded_file, engine='openpyxl', header=None)
-        df = df.ffill()
-        df = df.iloc[1:].reset_index(drop=True)
-        return df
+        _, _, origen = cargar_torneo(contenido)
+        return ORIGENES[origen]
     except Exception as e:
         st.error(f"Error: {e}")
         return None
 
-def generar_excel_resumen(df_original):
-    output = io.BytesIO()
-    workbook = xlsxwriter.Workbook(output, {'in_memory': True})
-    header_fmt = workbook.add_format({'bold': True, 'bg_color': '#D3D3D3', 'border': 1})
-    
-    # 1. ASESORES
-    sheet_asesores = workbook.add_worksheet("Asesores")
-    cols_asesor = ["Escuela", "Nombre", "Ap. Paterno", "Ap. Materno", "Celular", "Correo"]
-    for c, val in enumerate(cols_asesor): sheet_asesores.write(0, c, val, header_fmt)
-        
-    asesores_unicos = set()
-    row_asesor = 1
-    for _, row in df_original.iterrows():
-        nombre = limpiar_dato(row.iloc[5])
-        celular = limpiar_dato(row.iloc[8])
-        if nombre and (nombre, celular) not in asesores_unicos:
-            asesores_unicos.add((nombre, celular))
-            datos = [limpiar_dato(row.iloc[1]), nombre, limpiar_dato(row.iloc[6]), 
-                     limpiar_dato(row.iloc[7]), celular, limpiar_dato(row.iloc[9])]
-            for c, val in enumerate(datos): sheet_asesores.write(row_asesor, c, val)
-            row_asesor += 1
+@st.cache_resource(show_spinner=False, max_entries=8)
+def torneo(huella):
+    """Tablas y equipos de un archivo del almacén.
 
-    # 2. ALUMNOS (TRANSPOSICIÓN)
-    config_pos = [[10, 11, 12, 13, 16], [17, 18, 19, 20, 23], [24, 25, 26, 27, 30], 
-                  [31, 32, 33, 34, 37], [39, 40, 41, 42, 45]]
-    headers_al = ["Escuela", "Equipo", "Categoría", "Matrícula", "Ap. Paterno", "Ap. Materno", "Nombre", "Correo Inst."]
-    
-    sheets = {
-        "Línea":      {"obj": workbook.add_worksheet("Línea"), "row": 1, "max": 4},
-        "Laberinto":  {"obj": workbook.add_worksheet("Laberinto"), "row": 1, "max": 4},
-        "Escenario":  {"obj": workbook.add_worksheet("Escenario"), "row": 1, "max": 5},
-    }
-    for k in sheets:
-        for c, val in enumerate(headers_al): sheets[k]["obj"].write(0, c, val, header_fmt)
+    cache_resource regresa el mismo objeto a todas las sesiones (sin copias),
+    así que nadie debe modificarlo.
+    """
+    tablas = obtener_almacen().cargar(huella)
+    return tablas, leer_equipos(tablas)
 
-    for _, row in df_original.iterrows():
-        escuela = limpiar_dato(row.iloc[1])
-        equipo = limpiar_dato(row.iloc[3])
-        cat_txt = limpiar_dato(row.iloc[4])
-        if not escuela or not equipo: continue
+@st.cache_resource(show_spinner=False, max_entries=8)
+def reporte_excel(huella, _tablas):
+    """Excel clasificado, memoizado por la huella del archivo de origen.
 
-        target = None
-        if "línea" in cat_txt.lower() or "linea" in cat_txt.lower(): target = "Línea"
-        elif "laberinto" in cat_txt.lower(): target = "Laberinto"
-        elif "escenario" in cat_txt.lower(): target = "Escenario"
-        
-        if target:
-            cfg = sheets[target]
-            for i in range(cfg["max"]):
-                idx = config_pos[i]
-                if idx[0] < len(row):
-                    mat = limpiar_dato(row.iloc[idx[0]])
-                    if mat:
-                        d = [escuela, equipo, target, mat, limpiar_dato(row.iloc[idx[1]]), 
-                             limpiar_dato(row.iloc[idx[2]]), limpiar_dato(row.iloc[idx[3]]), 
-                             limpiar_dato(row.iloc[idx[4]])]
-                        for c, v in enumerate(d): cfg["obj"].write(cfg["row"], c, v)
-                        cfg["row"] += 1
-    workbook.close()
-    return output.getvalue(), len(asesores_unicos)
+    cache_resource entrega los mismos bytes a todas las sesiones; la sesión
+    solo recuerda la huella del reporte que pidió.
+    """
+    with medir("reporte", huella=huella, filas=len(_tablas["alumnos"])) as m:
+        datos = generar_excel_resumen(_tablas)[0]
+        m["bytes"] = len(datos)
+    return datos
 
-def procesar_zip_correo(df):
-    equipos = []
-    cols_mat = [10, 17, 24, 31, 39] 
-    for _, row in df.iterrows():
-        esc = limpiar_dato(row.iloc[1])
-        eq = limpiar_dato(row.iloc[3])
-        cat = limpiar_dato(row.iloc[4])
-        if not esc or not eq: continue
+ETIQUETAS_TRABAJO = {
+    "nuevo": "en espera", "en_curso": "enviando", "terminado": "terminado", "detenido": "detenido",
+    "interrumpido": "interrumpido", "error": "falló",
+}
 
-        nom_carpeta = "".join([c if c.isalnum() or c in " -_" else "-" for c in f"{esc} {eq} {cat}".strip()])
-        cel_coach = limpiar_dato(row.iloc[8])
-        mail_coach = limpiar_dato(row.iloc[9])
-        
-        imgs = []
-        if cel_coach: imgs.append({"name": f"Coach_{cel_coach}.png", "bytes": generar_qr_bytes(cel_coach)})
-        
-        max_al = 5 if "escenario" in str(cat).lower() else 4
-        for i, c_idx in enumerate(cols_mat):
-            if i >= max_al: break
-            if c_idx < len(row):
-                mat = limpiar_dato(row.iloc[c_idx])
-                if mat: imgs.append({"name": f"Alumno_{mat}.png", "bytes": generar_qr_bytes(mat)})
+def mostrar_trabajo(tid, pwd, sondeo=False):
+    """Progreso de un trabajo de envío leído de la cola persistente."""
+    cola = obtener_cola()
+    r = cola.resumen(tid)
+    if sondeo and not r["activo"]:
+        # Terminó mientras se consultaba: refrescar toda la página
+        st.rerun()
+    hechos = r["enviado"] + r["error"] + r["incierto"]
+    st.progress(hechos / r["total"] if r["total"] else 1.0,
+                text=f"Envío #{tid} ({ETIQUETAS_TRABAJO[r['estado']]}): {r['enviado']} de {r['total']} enviados")
+    st.caption(f"Pendientes: {r['pendiente'] + r['enviando']} · Errores: {r['error']} · Sin confirmar: {r['incierto']}")
+    if r["mensaje"]: st.error(f"Error de conexión: {r['mensaje']}")
 
-        equipos.append({"Carpeta": nom_carpeta, "Equipo": eq, "Correo": mail_coach, "Imagenes": imgs})
-    return equipos
+    if r["activo"]:
+        if not r["propio"]:
+            st.caption(f"Este envío lo está haciendo otro proceso (pid {r['pid']}), p. ej. la línea de comandos.")
+        elif st.button("⏹️ Detener envío", key=f"detener_{tid}", use_container_width=True):
+            cola.detener(tid)
+        return
+
+    if r["estado"] == "terminado" and not (r["pendiente"] or r["error"]):
+        st.success(f"¡Proceso finalizado! Se enviaron {r['enviado']} correos exitosamente.")
+    if r["pendiente"] or r["error"]:
+        reintentar = st.checkbox("Reintentar también los que dieron error", key=f"reintentar_{tid}")
+        if st.button("▶️ Reanudar envío", key=f"reanudar_{tid}", use_container_width=True):
+            if not pwd:
+                st.error("Faltan credenciales.")
+            else:
+                if reintentar: cola.reintentar(tid)
+                if cola.iniciar(tid, pwd): st.rerun()
+                else: st.warning("El envío ya está en curso en otro proceso.")
+    if r["error"]:
+        with st.expander(f"❌ Errores ({r['error']})"):
+            for f in cola.envios(tid, "error"): st.write(f"- {f['equipo']} ({f['correo']}): {f['error']}")
+    if r["incierto"]:
+        with st.expander(f"⚠️ Sin confirmar ({r['incierto']})"):
+            st.caption("El envío se interrumpió mientras se mandaban estos correos; pudieron haber llegado. "
+                       "No se reenvían automáticamente para no duplicarlos.")
+            for f in cola.envios(tid, "incierto"): st.write(f"- {f['equipo']} ({f['correo']})")
+            if st.button("Marcar como pendientes", key=f"inciertos_{tid}"):
+                cola.reintentar(tid, ("incierto",))
+                st.rerun()
 
 # --- INTERFAZ DE USUARIO (NUEVA ESTRUCTURA) ---
 
@@ -157,43 +136,77 @@ st.markdown("---")
 # 2. CARGA DE ARCHIVO
 uploaded_file = st.file_uploader("📂 Cargar Archivo Excel Maestro (.xlsx)", type=["xlsx"])
 
-if "df_master" not in st.session_state: st.session_state.df_master = None
-if "datos_proc" not in st.session_state: st.session_state.datos_proc = []
+# La sesión solo guarda la huella del archivo; las tablas viven en el almacén compartido
+if "huella" not in st.session_state: st.session_state.huella = None
 
 if uploaded_file:
-    with st.spinner("Analizando estructura..."):
-        df = cargar_dataframe(uploaded_file)
-        if df is not None:
-            st.session_state.df_master = df
-            st.session_state.datos_proc = procesar_zip_correo(df)
-            st.success(f"✅ Archivo cargado exitosamente. Se detectaron {len(st.session_state.datos_proc)} equipos.")
+    contenido = uploaded_file.getvalue()
+    huella = huella_archivo(contenido)
+    if st.session_state.huella != huella:
+        with st.spinner("Analizando estructura..."):
+            origen = procesar_archivo(contenido)
+        if origen is not None:
+            # Solo los datos de cada QR; las imágenes se generan al exportar o enviar
+            st.session_state.huella = huella
+            # Diferencias contra el archivo cargado antes (de cualquier sesión)
+            st.session_state.cambios = obtener_historial().cambios(huella, torneo(huella)[1])
+            st.session_state.origen_datos = origen
+        else:
+            st.session_state.huella = None
+    elif st.session_state.huella is not None:
+        st.session_state.origen_datos = "caché de la sesión"
+
+    if st.session_state.huella is not None:
+        st.success(f"✅ Archivo cargado exitosamente. Se detectaron {len(torneo(huella)[1])} equipos.")
+        st.caption(f"Archivo {huella[:12]}: {st.session_state.origen_datos}.")
+        cambios = st.session_state.get("cambios")
+        if cambios:
+            fecha = time.strftime("%d/%m/%Y %H:%M", time.localtime(cambios["creado"]))
+            st.info(f"🔄 Cambios respecto a la versión anterior ({cambios['anterior'][:12]}, {fecha}): "
+                    f"**{len(cambios['agregados'])}** agregados · **{len(cambios['modificados'])}** modificados · "
+                    f"**{len(cambios['eliminados'])}** eliminados · {cambios['sin_cambio']} sin cambios.")
+            if cambios["agregados"] or cambios["modificados"] or cambios["eliminados"]:
+                with st.expander("Ver equipos con cambios"):
+                    for titulo, grupo in [("Agregados", "agregados"), ("Modificados", "modificados"),
+                                          ("Eliminados", "eliminados")]:
+                        if cambios[grupo]: st.markdown(f"**{titulo}:** " + ", ".join(cambios[grupo]))
 
 # MOSTRAR SECCIONES SOLO SI HAY DATOS
-if st.session_state.df_master is not None:
-    df = st.session_state.df_master
-    datos = st.session_state.datos_proc
+if st.session_state.huella is not None:
+    tablas, datos = torneo(st.session_state.huella)
+    cambios = st.session_state.get("cambios")
+    # Con una versión anterior, ZIP y envío se ofrecen solo para lo nuevo o modificado (aunque no haya nada)
+    hay_version = cambios is not None
     
     # --- PARTE 2: REPORTES EXCEL (Uniformemente distribuido) ---
     st.write("### 📊 Generación de Reportes")
     with st.container(border=True):
         col_excel_1, col_excel_2 = st.columns([1, 2])
         
-        excel_bytes, n_asesores = generar_excel_resumen(df)
-        
         with col_excel_1:
-            st.metric(label="Asesores Únicos", value=n_asesores)
+            # Conteo directo de la tabla de asesores: no hace falta armar el Excel
+            st.metric(label="Asesores Únicos", value=contar_asesores(tablas))
             st.caption("Total de profesores sin repetir.")
             
         with col_excel_2:
             st.info("Descarga el reporte clasificado por categorías (Vertical).")
-            st.download_button(
-                label="📥 Descargar Reporte Excel Clasificado",
-                data=excel_bytes,
-                file_name="Reporte_Torneo_Vertical.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                type="primary",
-                use_container_width=True
-            )
+            huella = st.session_state.huella
+            if st.session_state.get("reporte_pedido") != huella:
+                hueco_reporte = st.empty()
+                if hueco_reporte.button("📊 Preparar Reporte Excel", use_container_width=True):
+                    st.session_state.reporte_pedido = huella
+                    hueco_reporte.empty()
+            if st.session_state.get("reporte_pedido") == huella:
+                with st.spinner("Generando reporte..."):
+                    reporte = reporte_excel(huella, tablas)
+                st.download_button(
+                    label="📥 Descargar Reporte Excel Clasificado",
+                    data=reporte,
+                    file_name="Reporte_Torneo_Vertical.xlsx",
+                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                    type="primary",
+                    use_container_width=True
+                )
 
     st.write("") # Espacio
     
@@ -208,69 +221,107 @@ if st.session_state.df_master is not None:
         with st.container(border=True):
             st.subheader("📂 Descargar QRs")
             st.write("Genera un archivo ZIP con carpetas organizadas por equipo.")
-            if st.button("Generar ZIP de Imágenes", use_container_width=True):
-                b = io.BytesIO()
-                with zipfile.ZipFile(b, "w", zipfile.ZIP_DEFLATED) as z:
-                    for eq in datos:
-                        for img in eq["Imagenes"]:
-                            z.writestr(f"{eq['Carpeta']}/{img['name']}", img['bytes'])
-                st.download_button("⬇️ Guardar ZIP en PC", b.getvalue(), "QRs_Torneo.zip", "application/zip", use_container_width=True)
+            modo_zip = st.selectbox("Compresión", list(MODOS_ZIP), format_func=MODOS_ZIP.get,
+                                    help="Los PNG ya están comprimidos; guardarlos sin compresión es más rápido.")
+            nivel_zip = st.slider("Nivel de compresión", 1, 9, 6, disabled=modo_zip == "stored")
+            perfil_zip = st.selectbox("Perfil de QR", list(NOMBRES_PERFIL), format_func=NOMBRES_PERFIL.get,
+                                      key="perfil_zip", help="Tamaño del módulo, corrección de errores y formato de imagen.")
+            solo_cambios_zip = hay_version and st.checkbox(
+                f"Solo equipos nuevos o modificados ({len(cambios['cambiados'])})", value=True, key="solo_cambios_zip")
+            datos_zip = cambios["cambiados"] if solo_cambios_zip else datos
+            if not datos_zip: st.info("No hay equipos nuevos o modificados que exportar.")
+            if st.button("Generar ZIP de Imágenes", use_container_width=True, disabled=not datos_zip):
+                barra_zip = st.progress(0, text="Generando QRs...")
+                def avance_zip(hechos, total):
+                    barra_zip.progress(hechos / total, text=f"Generando QRs... {hechos}/{total} equipos")
+                resumen_qr = {}
+                with medir("zip", huella=st.session_state.huella, filas=len(datos_zip), perfil=perfil_zip,
+                           modo=modo_zip) as m:
+                    archivo_zip = escribir_zip(datos_zip, progreso=avance_zip, modo=modo_zip, nivel=nivel_zip,
+                                               perfil=perfil_zip, resumen=resumen_qr)
+                    with archivo_zip: datos_archivo_zip = archivo_zip.read()
+                    m.update(qrs=resumen_qr.get("renderizados", 0), bytes=len(datos_archivo_zip))
+                barra_zip.empty()
+                # Una sola copia en memoria: la que se entrega al botón de descarga
+                st.download_button("⬇️ Guardar ZIP en PC", datos_archivo_zip, "QRs_Torneo.zip", "application/zip", use_container_width=True)
+                st.caption(f"QRs en el ZIP: {resumen_qr['referencias']} · distintos: {resumen_qr['distintos']} · "
+                           f"renderizados ahora: {resumen_qr.get('renderizados', 0)} · "
+                           f"de caché: {resumen_qr.get('desde_cache', 0)}")
+                est = obtener_cache().estadisticas()
+                st.caption(f"Caché QR: {est['aciertos'] + est['aciertos_disco']} aciertos "
+                           f"({est['aciertos_disco']} desde disco) · {est['fallos']} generados · "
+                           f"{est['entradas']} en memoria ({est['bytes'] / 1024:.0f} KB)")
 
     # COLUMNA DERECHA: EMAIL
     with col_der:
         with st.container(border=True):
             st.subheader("📧 Enviar a Asesores")
-            validos = [e for e in datos if e.get('Correo') and "@" in str(e.get('Correo'))]
+            solo_cambios_correo = hay_version and st.checkbox(
+                f"Enviar solo a equipos nuevos o modificados ({len(cambios['cambiados'])})", value=True,
+                key="solo_cambios_correo")
+            destino = cambios["cambiados"] if solo_cambios_correo else datos
+            validos = con_correo(destino)
+            if solo_cambios_correo and not destino: st.info("No hay cambios que enviar.")
             st.markdown(f"**{len(validos)} equipos** listos para envío.")
+            refs_qr, distintos_qr = contar_datos(validos)
+            # Los repetidos (un coach con varios equipos) salen de la caché de QRs del proceso
+            st.caption(f"{refs_qr} QRs adjuntos, {distintos_qr} distintos: cada uno se genera una sola vez.")
             
             with st.expander("⚙️ Configurar Envío", expanded=True):
                 user = st.text_input("Tu Correo (Gmail/Outlook)")
                 pwd = st.text_input("Contraseña de Aplicación", type="password")
-                prov = st.selectbox("Proveedor", ["Gmail", "Outlook", "Yahoo"])
+                prov = st.selectbox("Proveedor", list(PROVEEDORES))
+                c_conex, c_seg, c_min = st.columns(3)
+                n_conex = c_conex.number_input("Conexiones simultáneas", 1, 10, CONEXIONES_DEFECTO)
+                por_seg = c_seg.number_input("Correos por segundo", 0.1, 20.0, LIMITES[prov][0], step=0.1)
+                por_min = c_min.number_input("Correos por minuto", 1, 600, LIMITES[prov][1])
+                formato = st.selectbox("Formato de adjuntos", list(ADJUNTOS),
+                                       help="Un solo archivo por equipo es más fácil de imprimir y reenviar.")
+                perfil_correo = st.selectbox("Perfil de QR", list(NOMBRES_PERFIL), format_func=NOMBRES_PERFIL.get,
+                                             key="perfil_correo", disabled=ADJUNTOS[formato] not in ("png", "zip"),
+                                             help="Las hojas de contactos usan siempre el perfil original.")
+                agrupar = st.checkbox("Un solo correo por coach con todos sus equipos", value=False,
+                                      help="Los QR van organizados por equipo dentro del mismo correo.")
+                destinatarios = agrupar_por_coach(validos) if agrupar else validos
+                ahorro = len(validos) - len(destinatarios)
+                if agrupar and ahorro:
+                    minutos = (duracion_estimada(len(validos), por_seg, por_min)
+                               - duracion_estimada(len(destinatarios), por_seg, por_min)) / 60
+                    st.caption(f"{len(validos)} equipos → {len(destinatarios)} correos: {ahorro} correos menos, "
+                               f"≈ {minutos:.1f} min menos con el límite actual.")
                 
                 # NUEVO: PERSONALIZACIÓN DEL MENSAJE
                 st.markdown("**Mensaje para el Asesor:**")
-                asunto_base = st.text_input("Asunto del correo", value="Accesos QR - Torneo de Robótica")
-                mensaje_cuerpo = st.text_area("Cuerpo del correo", value="Estimado Coach,\n\nAdjunto a este correo encontrará los códigos QR de acceso para los integrantes de su equipo.\n\nEstos deberán ser presentados por sus alumnos en el momento de registrarse.\n\nFavor de distribuirlos.\n\nEn el caso de faltar alguno o presentar problemas, por favor notificar al coordinador del torneo.\n\nSaludos cordiales.", height=150)
+                asunto_base = st.text_input("Asunto del correo", value=ASUNTO_DEFECTO)
+                mensaje_cuerpo = st.text_area("Cuerpo del correo", value=CUERPO_DEFECTO, height=150)
 
-            if st.button("✈️ Enviar Correos Masivos", type="primary", use_container_width=True):
+            cola = obtener_cola()
+            tid = st.session_state.get("trabajo_envio") or cola.ultimo(st.session_state.huella)
+            en_curso = tid is not None and cola.activo(tid)
+            if st.button("✈️ Enviar Correos Masivos", type="primary", use_container_width=True,
+                         disabled=en_curso or not destinatarios):
                 if not user or not pwd:
                     st.error("Faltan credenciales.")
                 else:
-                    progreso = st.progress(0)
-                    estado = st.empty()
-                    host, port = {
-                        "Gmail": ("smtp.gmail.com", 465),
-                        "Outlook": ("smtp.office365.com", 587),
-                        "Yahoo": ("smtp.mail.yahoo.com", 465)
-                    }[prov]
-                    
-                    try:
-                        server = smtplib.SMTP(host, port) if prov == "Outlook" else smtplib.SMTP_SSL(host, port)
-                        if prov == "Outlook": server.starttls()
-                        server.login(user, pwd)
-                        
-                        enviados_count = 0
-                        for i, eq in enumerate(validos):
-                            # Actualizar barra
-                            progreso.progress((i + 1) / len(validos))
-                            estado.text(f"Enviando a: {eq['Equipo']} ({eq['Correo']})")
-                            
-                            msg = EmailMessage()
-                            msg['Subject'] = f"{asunto_base} - {eq['Equipo']}"
-                            msg['From'] = user
-                            msg['To'] = eq['Correo']
-                            msg.set_content(mensaje_cuerpo) # Usamos el mensaje personalizado
-                            
-                            for img in eq['Imagenes']:
-                                msg.add_attachment(img['bytes'], maintype='image', subtype='png', filename=img['name'])
-                            
-                            server.send_message(msg)
-                            enviados_count += 1
-                            time.sleep(1.5) # Pausa leve anti-spam
-                        
-                        server.quit()
-                        st.balloons()
-                        st.success(f"¡Proceso finalizado! Se enviaron {enviados_count} correos exitosamente.")
-                    except Exception as e:
-                        st.error(f"Error de conexión: {e}")
\ No newline at end of file
+                    # El envío corre en segundo plano: sobrevive a reruns y a cerrar la pestaña
+                    tid = cola.crear(destinatarios, prov, user, asunto_base, mensaje_cuerpo, huella=st.session_state.huella,
+                                     conexiones=n_conex, por_segundo=por_seg, por_minuto=por_min,
+                                     adjuntos=ADJUNTOS[formato], perfil=perfil_correo)
+                    cola.iniciar(tid, pwd)
+                    st.session_state.trabajo_envio = tid
+                    en_curso = True
+
+            if tid is not None:
+                if en_curso: st.fragment(run_every=2)(mostrar_trabajo)(tid, pwd, sondeo=True)
+                else: mostrar_trabajo(tid, pwd)
+
+# --- RENDIMIENTO ---
+registros = recientes(st.session_state.huella) if st.session_state.huella else []
+if registros:
+    with st.expander("⏱️ Rendimiento"):
+        st.caption("Por etapa: tiempo de pared, CPU del hilo de la etapa y de todo el proceso (incluye otras "
+                   "sesiones y envíos en curso), filas, QRs generados, bytes y memoria extra (pico de RSS durante "
+                   f"la etapa). El historial completo se guarda en {RUTA_LOG} (una línea JSON por etapa).")
+        columnas = ["etapa", "pared_s", "cpu_hilo_s", "cpu_proceso_s", "cpu_hijos_s", "filas", "qrs", "bytes",
+                    "rss_extra_mb", "error"]
+        st.dataframe([{c: r.get(c) for c in columnas} for r in registros], hide_index=True, use_container_width=True)
@@ -0,0 +1 @@
+# Benchmarks del pipeline. Ejecutar desde la raíz: python -m benchmarks.<modulo>
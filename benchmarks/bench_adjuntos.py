@@ -0,0 +1,43 @@
+"""Tamaño y costo de cada formato de adjuntos por equipo.
+
+Compara el formato original (un PNG por persona) contra un ZIP por equipo y
+las hojas de contactos en PNG y PDF: bytes de los adjuntos, bytes del correo
+ya codificado en MIME (lo que realmente se sube al servidor) y tiempo de armado.
+Uso: python -m benchmarks.bench_adjuntos [--equipos 200]
+"""
+import argparse
+import time
+
+from benchmarks.sintetico import dataframe_sintetico
+from registro.mime import PreparadorCorreo
+from registro.paquetes import ADJUNTOS, adjuntos_equipo
+from registro.qr import renderizar_lote
+from registro.roster import leer_equipos, normalizar
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--equipos", type=int, default=200)
+    args = parser.parse_args()
+
+    equipos = leer_equipos(normalizar(dataframe_sintetico(args.equipos)))
+    # Los QR quedan en caché para medir solo el empaquetado
+    renderizar_lote([img["dato"] for e in equipos for img in e["Imagenes"]])
+
+    print(f"{'formato':<26} {'archivos':>9} {'KB adjunto':>11} {'KB correo':>10} {'ms/equipo':>10} {'vs PNG':>7}")
+    base = None
+    for etiqueta, modo in ADJUNTOS.items():
+        preparador = PreparadorCorreo("torneo@example.com", "Accesos QR", "Saludos.", modo)
+        inicio = time.perf_counter()
+        correo = sum(len(preparador.preparar(eq).datos) for eq in equipos)
+        segundos = time.perf_counter() - inicio
+        adjuntos = [a for eq in equipos for a in adjuntos_equipo(eq, modo)]
+        archivos, crudo = len(adjuntos), sum(len(a[1]) for a in adjuntos)
+        n = len(equipos)
+        if base is None: base = correo
+        print(f"{etiqueta:<26} {archivos / n:>9.1f} {crudo / n / 1024:>11.1f} {correo / n / 1024:>10.1f} "
+              f"{segundos * 1000 / n:>10.2f} {correo / base:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
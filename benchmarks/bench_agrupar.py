@@ -0,0 +1,68 @@
+"""Un correo por equipo contra un correo por coach.
+
+Cuenta mensajes y bytes de ambos modos, estima la duración con los límites de
+cada proveedor y mide el envío real contra un servidor local (aiosmtpd) con
+un límite escalado para que la prueba tome segundos.
+Requiere: pip install aiosmtpd
+Uso: python -m benchmarks.bench_agrupar [--equipos 3000] [--enviar 300] [--por-segundo 50]
+"""
+import argparse
+import time
+
+from benchmarks.bench_smtp import Receptor, puerto_libre
+from benchmarks.sintetico import dataframe_sintetico
+from registro.correo import LIMITES, DespachadorCorreo, duracion_estimada
+from registro.mime import PreparadorCorreo
+from registro.paquetes import agrupar_por_coach
+from registro.qr import renderizar_lote
+from registro.roster import leer_equipos, normalizar
+
+
+def enviar(port, destinatarios, por_segundo):
+    preparador = PreparadorCorreo("torneo@example.com", "Accesos QR", "Saludos.")
+    inicio = time.perf_counter()
+    with DespachadorCorreo("127.0.0.1", port, "ninguna", conexiones=4, por_segundo=por_segundo) as despachador:
+        errores = sum(1 for _, e in despachador.enviar([lambda d=d: preparador.preparar(d) for d in destinatarios]) if e)
+    return time.perf_counter() - inicio, errores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--equipos", type=int, default=3000)
+    parser.add_argument("--enviar", type=int, default=300, help="Equipos a mandar al servidor local (0 = no enviar)")
+    parser.add_argument("--por-segundo", type=float, default=50)
+    args = parser.parse_args()
+
+    equipos = leer_equipos(normalizar(dataframe_sintetico(args.equipos)))
+    renderizar_lote([img["dato"] for e in equipos for img in e["Imagenes"]])
+    modos = {"por equipo": equipos, "por coach": agrupar_por_coach(equipos)}
+
+    preparador = PreparadorCorreo("torneo@example.com", "Accesos QR", "Saludos.")
+    print(f"{'modo':<11} {'correos':>8} {'MB':>7}" + "".join(f" {p + ' (min)':>15}" for p in LIMITES))
+    for nombre, destinatarios in modos.items():
+        mb = sum(len(preparador.preparar(d).datos) for d in destinatarios) / 1e6
+        minutos = [duracion_estimada(len(destinatarios), *LIMITES[p]) / 60 for p in LIMITES]
+        print(f"{nombre:<11} {len(destinatarios):>8} {mb:>7.1f}" + "".join(f" {m:>15.1f}" for m in minutos))
+    ahorro = len(modos["por equipo"]) - len(modos["por coach"])
+    print(f"Correos ahorrados: {ahorro} ({ahorro / len(equipos):.0%})")
+
+    if not args.enviar: return
+    from aiosmtpd.controller import Controller
+
+    receptor = Receptor()
+    port = puerto_libre()
+    controlador = Controller(receptor, hostname="127.0.0.1", port=port)
+    controlador.start()
+    try:
+        muestra = equipos[:args.enviar]
+        print(f"\nEnvío real de {len(muestra)} equipos a {args.por_segundo:g} correos/s:")
+        print(f"{'modo':<11} {'correos':>8} {'tiempo (s)':>11} {'errores':>8}")
+        for nombre, destinatarios in [("por equipo", muestra), ("por coach", agrupar_por_coach(muestra))]:
+            segundos, errores = enviar(port, destinatarios, args.por_segundo)
+            print(f"{nombre:<11} {len(destinatarios):>8} {segundos:>11.2f} {errores:>8}")
+    finally:
+        controlador.stop()
+
+
+if __name__ == "__main__":
+    main()
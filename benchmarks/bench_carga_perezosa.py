@@ -0,0 +1,55 @@
+"""Tiempo hasta la primera interacción y memoria pico al cargar un roster.
+
+"antes": se generan y guardan todas las imágenes al subir el archivo.
+"después": solo se leen los datos; los QRs se generan al exportar.
+
+Uso: python -m benchmarks.bench_carga_perezosa [--equipos 600]
+"""
+import argparse
+import time
+import tracemalloc
+
+from benchmarks.sintetico import dataframe_sintetico
+from registro.cache_qr import CacheQR
+from registro.qr import renderizar_lote
+from registro.roster import leer_equipos, normalizar
+
+
+def carga_antes(df):
+    equipos = leer_equipos(normalizar(df))
+    todos = [img["dato"] for e in equipos for img in e["Imagenes"]]
+    pngs = iter(renderizar_lote(todos, workers=1, cache=CacheQR(max_bytes=1 << 30)))
+    for e in equipos:
+        for img in e["Imagenes"]: img["bytes"] = next(pngs)
+    return equipos
+
+
+def carga_despues(df):
+    return leer_equipos(normalizar(df))
+
+
+def medir(funcion, df):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    equipos = funcion(df)
+    segundos = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return equipos, segundos, pico
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--equipos", type=int, default=600)
+    args = parser.parse_args()
+
+    df = dataframe_sintetico(args.equipos)
+    print(f"{'modo':<8} {'equipos':>8} {'QRs':>6} {'tiempo (s)':>11} {'pico (MB)':>10}")
+    for nombre, funcion in [("antes", carga_antes), ("después", carga_despues)]:
+        equipos, segundos, pico = medir(funcion, df)
+        n_qr = sum(len(e["Imagenes"]) for e in equipos)
+        print(f"{nombre:<8} {len(equipos):>8} {n_qr:>6} {segundos:>11.2f} {pico / 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
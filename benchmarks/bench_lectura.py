@@ -0,0 +1,85 @@
+"""Tiempo y memoria de lectura del Excel maestro con cada motor de ingesta.
+
+Cada motor corre en un subproceso para medir su RSS pico por separado, y se
+verifica que todos produzcan los mismos equipos que openpyxl. Además del
+maestro sintético se lee una copia con una nota en una columna que no se usa,
+varias filas abajo del último equipo.
+Uso: python -m benchmarks.bench_lectura [--equipos 2000] [--archivo maestro.xlsx]
+"""
+import argparse
+import hashlib
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import openpyxl
+
+from benchmarks.sintetico import escribir_excel
+from registro.lectura import MOTORES, leer_excel
+from registro.roster import leer_equipos, normalizar
+
+# Columna AX: fuera de las que lee el roster
+COLUMNA_NOTA = 50
+
+
+def con_nota(ruta, destino, filas_abajo=6):
+    """Copia del maestro con una nota suelta debajo del último equipo."""
+    wb = openpyxl.load_workbook(ruta)
+    ws = wb.worksheets[0]
+    ws.cell(row=ws.max_row + filas_abajo, column=COLUMNA_NOTA, value="Nota: revisar pagos")
+    wb.save(destino)
+    return destino
+
+
+def huella_equipos(df):
+    # Mismo camino que cargar_dataframe: propagar combinadas y quitar la fila de subtítulos
+    equipos = leer_equipos(normalizar(df.ffill().iloc[1:].reset_index(drop=True)))
+    return hashlib.sha256(json.dumps(equipos, default=str, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def correr_motor(motor, ruta):
+    rss_base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    inicio = time.perf_counter()
+    df, usado = leer_excel(ruta, motor)
+    segundos = time.perf_counter() - inicio
+    rss_pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"motor": motor, "usado": usado, "segundos": segundos, "forma": list(df.shape),
+                      "rss_extra_kb": rss_pico - rss_base, "huella": huella_equipos(df)}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--equipos", type=int, default=2000)
+    parser.add_argument("--archivo", help="Excel real a medir en lugar de uno sintético")
+    parser.add_argument("--motor", choices=MOTORES)
+    args = parser.parse_args()
+
+    if args.motor:
+        correr_motor(args.motor, args.archivo)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = args.archivo or escribir_excel(os.path.join(tmp, "maestro.xlsx"), args.equipos)
+        rutas = [ruta, con_nota(ruta, os.path.join(tmp, "maestro_con_nota.xlsx"))]
+        for ruta in rutas:
+            print(f"\n{os.path.basename(ruta)}: {os.path.getsize(ruta) / 1e6:.1f} MB")
+            print(f"{'motor':<12} {'usado':<12} {'tiempo (s)':>11} {'filas x cols':>13} {'RSS extra (MB)':>15} "
+                  f"{'idéntico':>9}")
+            resultados = {}
+            for motor in MOTORES:
+                salida = subprocess.run([sys.executable, "-m", "benchmarks.bench_lectura", "--motor", motor,
+                                         "--archivo", ruta], capture_output=True, text=True, check=True)
+                resultados[motor] = json.loads(salida.stdout.strip().splitlines()[-1])
+            for motor, r in resultados.items():
+                forma = "x".join(map(str, r["forma"]))
+                igual = "sí" if r["huella"] == resultados["openpyxl"]["huella"] else "NO"
+                print(f"{motor:<12} {r['usado']:<12} {r['segundos']:>11.2f} {forma:>13} "
+                      f"{r['rss_extra_kb'] / 1024:>15.1f} {igual:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Costo de armar los correos: EmailMessage por equipo contra partes MIME precodificadas.
+
+Incluye la serialización que hace smtplib al enviar, y opcionalmente reintentos.
+Uso: python -m benchmarks.bench_mime [--mensajes 1000] [--reintentos 1]
+"""
+import argparse
+import time
+import tracemalloc
+
+from email import policy
+
+from benchmarks import referencia
+from benchmarks.sintetico import dataframe_sintetico
+from registro.mime import MensajeCrudo, PreparadorCorreo
+from registro.qr import renderizar_lote
+from registro.roster import leer_equipos, normalizar
+
+ASUNTO = "Accesos QR - Torneo de Robótica"
+CUERPO = "Estimado Coach,\n\nAdjunto encontrará los códigos QR de acceso.\n\nSaludos cordiales."
+
+
+def original(equipos, reintentos):
+    total = 0
+    for eq in equipos:
+        for _ in range(1 + reintentos):
+            # Cada intento vuelve a construir y codificar el mensaje completo
+            msg = referencia.construir_mensaje(eq, "torneo@example.com", ASUNTO, CUERPO)
+            total += len(msg.as_bytes(policy=policy.SMTP))
+    return total
+
+
+def precodificado(equipos, reintentos):
+    preparador = PreparadorCorreo("torneo@example.com", ASUNTO, CUERPO)
+    total = 0
+    for eq in equipos:
+        msg = preparador.preparar(eq)
+        # Los reintentos reutilizan los mismos bytes
+        datos = msg.datos if isinstance(msg, MensajeCrudo) else msg.as_bytes(policy=policy.SMTP)
+        total += len(datos) * (1 + reintentos)
+    return total
+
+
+def medir(funcion, equipos, reintentos):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    total = funcion(equipos, reintentos)
+    segundos = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return segundos, pico, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mensajes", type=int, default=1000)
+    parser.add_argument("--reintentos", type=int, default=0)
+    args = parser.parse_args()
+
+    equipos = leer_equipos(normalizar(dataframe_sintetico(args.mensajes)))
+    renderizar_lote([img["dato"] for e in equipos for img in e["Imagenes"]])
+
+    print(f"{'modo':<14} {'tiempo (s)':>11} {'ms/msg':>8} {'pico (MB)':>10} {'MB enviados':>12}")
+    for nombre, funcion in [("original", original), ("precodificado", precodificado)]:
+        segundos, pico, total = medir(funcion, equipos, args.reintentos)
+        print(f"{nombre:<14} {segundos:>11.2f} {segundos * 1000 / len(equipos):>8.2f} "
+              f"{pico / 1e6:>10.1f} {total / 1e6:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
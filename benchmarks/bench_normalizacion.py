@@ -0,0 +1,58 @@
+"""Normalización vectorizada contra el recorrido original con iterrows().
+
+Mide el roster para QRs y el reporte Excel, y verifica que ambos den lo mismo.
+Uso: python -m benchmarks.bench_normalizacion [--filas 1000 10000 100000]
+"""
+import argparse
+import io
+import time
+
+import pandas as pd
+
+from benchmarks import referencia
+from benchmarks.sintetico import dataframe_sintetico
+from registro.reporte import generar_excel_resumen
+from registro.roster import leer_equipos, normalizar
+
+
+def cronometrar(funcion, *args):
+    inicio = time.perf_counter()
+    resultado = funcion(*args)
+    return resultado, time.perf_counter() - inicio
+
+
+def sin_etiquetas(equipos):
+    # La implementación original no tenía etiquetas para las hojas de contactos
+    return [{**e, "Imagenes": [{k: v for k, v in img.items() if k != "etiqueta"} for img in e["Imagenes"]]}
+            for e in equipos]
+
+
+def mismas_hojas(xlsx_a, xlsx_b):
+    hojas_a = pd.read_excel(io.BytesIO(xlsx_a), sheet_name=None, dtype=str)
+    hojas_b = pd.read_excel(io.BytesIO(xlsx_b), sheet_name=None, dtype=str)
+    return hojas_a.keys() == hojas_b.keys() and all(hojas_a[h].equals(hojas_b[h]) for h in hojas_a)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--filas", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--sin-verificar", action="store_true", help="No comparar el contenido de los Excel")
+    args = parser.parse_args()
+
+    print(f"{'filas':>7} {'roster orig (s)':>16} {'roster vect (s)':>16} "
+          f"{'reporte orig (s)':>17} {'reporte vect (s)':>17} {'idéntico':>9}")
+    for n in args.filas:
+        df = dataframe_sintetico(n)
+        eq_a, t_roster_a = cronometrar(referencia.leer_equipos, df)
+        (xlsx_a, n_a), t_rep_a = cronometrar(referencia.generar_excel_resumen, df)
+        # Las tablas se arman una vez y las comparten el roster y el reporte
+        tablas, t_tablas = cronometrar(normalizar, df)
+        eq_b, t_roster_b = cronometrar(leer_equipos, tablas)
+        (xlsx_b, n_b), t_rep_b = cronometrar(generar_excel_resumen, tablas)
+        igual = eq_a == sin_etiquetas(eq_b) and n_a == n_b
+        if igual and not args.sin_verificar: igual = mismas_hojas(xlsx_a, xlsx_b)
+        print(f"{n:>7} {t_roster_a:>16.2f} {t_tablas + t_roster_b:>16.2f} "
+              f"{t_rep_a:>17.2f} {t_rep_b:>17.2f} {'sí' if igual else 'NO':>9}")
+
+if __name__ == "__main__":
+    main()
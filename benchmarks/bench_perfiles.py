@@ -0,0 +1,51 @@
+"""Tamaño y tiempo de render de cada perfil de QR.
+
+Renderiza los mismos datos con cada perfil (sin caché, un solo proceso) y
+reporta el tamaño promedio por código, el total para el torneo y el tamaño
+del ZIP resultante, comparado contra el perfil original.
+Uso: python -m benchmarks.bench_perfiles [--qrs 3000]
+"""
+import argparse
+import io
+import time
+import zipfile
+
+from benchmarks.bench_qr_paralelo import datos_sinteticos
+from registro.cache_qr import CacheQR
+from registro.qr import PERFILES, renderizar_lote
+
+
+def tam_zip(imagenes, formato):
+    buf = io.BytesIO()
+    # SVG es texto y sí se comprime; el PNG ya viene comprimido
+    tipo = zipfile.ZIP_DEFLATED if formato == "svg" else zipfile.ZIP_STORED
+    with zipfile.ZipFile(buf, "w", tipo) as zf:
+        for i, datos in enumerate(imagenes): zf.writestr(f"{i}.{formato}", datos)
+    return len(buf.getvalue())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--qrs", type=int, default=3000)
+    args = parser.parse_args()
+    datos = datos_sinteticos(args.qrs)
+
+    print(f"{'perfil':<10} {'px':>5} {'corr.':>5} {'bytes/QR':>9} {'total (MB)':>11} {'ZIP (MB)':>9} "
+          f"{'ms/QR':>6} {'vs original':>12}")
+    base = None
+    for nombre, opciones in PERFILES.items():
+        inicio = time.perf_counter()
+        imagenes = renderizar_lote(datos, workers=1, cache=CacheQR(max_bytes=1 << 30), **opciones)
+        segundos = time.perf_counter() - inicio
+        total = sum(len(i) for i in imagenes)
+        comprimido = tam_zip(imagenes, opciones["formato"])
+        if base is None: base = comprimido
+        lado = opciones["box_size"] * (21 + 2 * opciones["border"])
+        print(f"{nombre:<10} {lado:>5} {opciones['correccion']:>5} {total / len(datos):>9.0f} "
+              f"{total / 1e6:>11.2f} {comprimido / 1e6:>9.2f} {segundos * 1000 / len(datos):>6.2f} "
+              f"{comprimido / base:>11.2f}x")
+    print("px: lado de la imagen para un QR versión 1 (21 módulos más el margen).")
+
+
+if __name__ == "__main__":
+    main()
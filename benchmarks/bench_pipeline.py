@@ -0,0 +1,148 @@
+"""Pipeline completo sobre Excel maestros sintéticos: lectura, reporte, QRs y ZIP.
+
+Cada escenario (número de equipos, mezcla de categorías, tasa de alumnos
+duplicados y de equipos repetidos) corre en un subproceso con una base y una
+caché nuevas, para que la memoria y la caché de QRs no se contaminen. Las
+etapas se miden con `registro.metricas`. Los resultados se agregan a un JSONL
+junto con el commit actual y se comparan contra la corrida anterior del mismo
+escenario.
+Uso: python -m benchmarks.bench_pipeline [--equipos 100 1000 5000] [--mezcla Escenario=2,Línea=1]
+       [--duplicados 0.1] [--repetidos 0.05] [--etiqueta antes-del-cambio] [--historial]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.sintetico import escribir_excel
+
+RESULTADOS = os.path.join(os.path.dirname(__file__), "resultados_pipeline.jsonl")
+ETAPAS = ["lectura", "normalizacion", "reporte", "qr", "zip"]
+
+
+def commit_actual():
+    try:
+        salida = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(__file__))
+        return salida.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "sin-git"
+
+
+def leer_mezcla(texto):
+    """Convierte 'Escenario=2,Línea=1' en {"Escenario": 2.0, "Línea": 1.0}."""
+    mezcla = {}
+    for parte in filter(None, texto.split(",")):
+        cat, _, peso = parte.partition("=")
+        mezcla[cat.strip()] = float(peso or 1)
+    return mezcla
+
+
+def llave_escenario(e):
+    mezcla = ",".join(f"{c}={p:g}" for c, p in sorted((e["mezcla"] or {}).items())) or "uniforme"
+    return f"{e['equipos']} equipos · {mezcla} · dup {e['duplicados']:g} · rep {e['repetidos']:g} · semilla {e['semilla']}"
+
+
+def correr_escenario(escenario, directorio):
+    """Corre las etapas en este proceso y regresa sus registros de métricas."""
+    # Importar después de fijar REGISTRO_DB / REGISTRO_METRICAS en el entorno del subproceso
+    from registro.metricas import medir, recientes
+    from registro.pipeline import cargar_torneo, construir_reporte, construir_zip
+    from registro.qr import contar_datos, renderizar_lote
+    from registro.roster import leer_equipos
+
+    ruta = escribir_excel(os.path.join(directorio, "maestro.xlsx"), escenario["equipos"], escenario["semilla"],
+                          mezcla=escenario["mezcla"], duplicados=escenario["duplicados"],
+                          repetidos=escenario["repetidos"])
+    with open(ruta, "rb") as f:
+        _, tablas, _ = cargar_torneo(f.read())
+    equipos = leer_equipos(tablas)
+    construir_reporte(tablas, os.path.join(directorio, "reporte.xlsx"))
+    referencias, distintos = contar_datos(equipos)
+    with medir("qr", filas=referencias) as m:
+        pngs = renderizar_lote(list(dict.fromkeys(img["dato"] for e in equipos for img in e["Imagenes"])))
+        m.update(qrs=len(pngs), bytes=sum(map(len, pngs)))
+    # Con la caché ya caliente el ZIP mide solo el empaquetado
+    construir_zip(equipos, os.path.join(directorio, "QRs.zip"))
+    return {"equipos_leidos": len(equipos), "qrs": referencias, "qrs_distintos": distintos,
+            "etapas": {r["etapa"]: r for r in reversed(recientes()) if r["etapa"] in ETAPAS}}
+
+
+def medir_en_subproceso(escenario):
+    with tempfile.TemporaryDirectory() as tmp:
+        entorno = {**os.environ, "REGISTRO_DB": os.path.join(tmp, "bench.sqlite3"), "REGISTRO_METRICAS": os.devnull}
+        entorno.pop("REGISTRO_QR_CACHE_DIR", None)
+        salida = subprocess.run([sys.executable, "-m", "benchmarks.bench_pipeline", "--escenario",
+                                 json.dumps(escenario, ensure_ascii=False), "--directorio", tmp],
+                                capture_output=True, text=True, check=True, env=entorno)
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def cargar_resultados(ruta):
+    if not os.path.exists(ruta): return []
+    with open(ruta, encoding="utf-8") as f:
+        return [json.loads(linea) for linea in f if linea.strip()]
+
+
+def imprimir(resultado, anterior=None):
+    print(f"\n{llave_escenario(resultado['escenario'])} [{resultado['etiqueta']}]: {resultado['equipos_leidos']} "
+          f"equipos leídos, {resultado['qrs']} QRs ({resultado['qrs_distintos']} distintos)")
+    titulo = f"{'etapa':<14} {'pared (s)':>10} {'CPU (s)':>8} {'CPU hijos (s)':>14} {'bytes':>11} {'RSS extra (MB)':>15}"
+    if anterior: titulo += f" {'vs ' + anterior['etiqueta']:>16}"
+    print(titulo)
+    for etapa in ETAPAS:
+        r = resultado["etapas"].get(etapa)
+        if r is None: continue
+        # Cada escenario corre solo en su subproceso, así que la CPU del proceso es la de la etapa
+        cpu = r.get("cpu_proceso_s", r.get("cpu_s", 0))
+        linea = (f"{etapa:<14} {r['pared_s']:>10.3f} {cpu:>8.3f} {r['cpu_hijos_s']:>14.3f} "
+                 f"{r.get('bytes') or 0:>11} {r.get('rss_extra_mb') or 0:>15.1f}")
+        previo = anterior and anterior["etapas"].get(etapa)
+        if previo and previo["pared_s"]: linea += f" {r['pared_s'] / previo['pared_s'] - 1:>+16.0%}"
+        print(linea)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--equipos", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--mezcla", type=leer_mezcla, default=None,
+                        help="Pesos por categoría, p. ej. Escenario=2,Línea=1,Laberinto=1 (por defecto iguales)")
+    parser.add_argument("--duplicados", type=float, default=0.0, help="Fracción de alumnos inscritos en dos equipos")
+    parser.add_argument("--repetidos", type=float, default=0.0, help="Fracción de equipos que vienen dos veces")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--etiqueta", help="Nombre de la corrida (por defecto, el commit actual)")
+    parser.add_argument("--resultados", default=RESULTADOS, help="JSONL donde se acumulan las corridas")
+    parser.add_argument("--no-guardar", action="store_true")
+    parser.add_argument("--historial", action="store_true", help="Solo mostrar las corridas guardadas")
+    parser.add_argument("--escenario", help=argparse.SUPPRESS)
+    parser.add_argument("--directorio", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.escenario:
+        print(json.dumps(correr_escenario(json.loads(args.escenario), args.directorio), ensure_ascii=False))
+        return
+
+    guardados = cargar_resultados(args.resultados)
+    if args.historial:
+        for r in guardados: imprimir(r)
+        return
+
+    etiqueta = args.etiqueta or commit_actual()
+    for n in args.equipos:
+        escenario = {"equipos": n, "mezcla": args.mezcla, "duplicados": args.duplicados,
+                     "repetidos": args.repetidos, "semilla": args.semilla}
+        resultado = {"etiqueta": etiqueta, "fecha": time.strftime("%Y-%m-%d %H:%M:%S"), "escenario": escenario,
+                     **medir_en_subproceso(escenario)}
+        previos = [r for r in guardados if llave_escenario(r["escenario"]) == llave_escenario(escenario)]
+        imprimir(resultado, previos[-1] if previos else None)
+        if args.no_guardar: continue
+        with open(args.resultados, "a", encoding="utf-8") as f:
+            f.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+    if not args.no_guardar: print(f"\nResultados agregados a {args.resultados}")
+
+
+if __name__ == "__main__":
+    main()
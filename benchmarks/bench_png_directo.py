@@ -0,0 +1,66 @@
+"""Codificador PNG directo (NumPy + zlib) contra make_image de PIL.
+
+Mide por separado la codificación (con la matriz ya calculada) y el render
+completo por código, y verifica que ambos caminos den los mismos pixeles.
+Uso: python -m benchmarks.bench_png_directo [--qrs 2000] [--perfiles original correo]
+"""
+import argparse
+import io
+import time
+
+import numpy as np
+import qrcode
+from PIL import Image
+
+from benchmarks.bench_qr_paralelo import datos_sinteticos
+from registro.qr import CORRECCION, PERFILES, _png_1bit, _png_pil
+
+
+def matrices(datos, opciones):
+    codigos = []
+    for d in datos:
+        qr = qrcode.QRCode(box_size=opciones["box_size"], border=opciones["border"],
+                           error_correction=CORRECCION[opciones["correccion"]])
+        qr.add_data(d)
+        qr.make(fit=True)
+        codigos.append(qr)
+    return codigos
+
+
+def pixeles(png):
+    with Image.open(io.BytesIO(png)) as img:
+        return np.asarray(img.convert("L"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--qrs", type=int, default=2000)
+    parser.add_argument("--perfiles", nargs="+", default=[p for p, o in PERFILES.items() if o["formato"] == "png"])
+    args = parser.parse_args()
+    datos = datos_sinteticos(args.qrs)
+
+    print(f"{'perfil':<10} {'camino':<8} {'cod. (ms)':>10} {'QR/s cod.':>10} {'QR/s total':>11} {'bytes/QR':>9} "
+          f"{'pixeles':>8}")
+    for perfil in args.perfiles:
+        opciones = PERFILES[perfil]
+        inicio = time.perf_counter()
+        codigos = matrices(datos, opciones)
+        t_matriz = time.perf_counter() - inicio
+        caminos = {
+            "PIL": lambda qr: _png_pil(qr, "black", "white", opciones["optimizar"]),
+            "directo": lambda qr: _png_1bit(qr.get_matrix(), opciones["box_size"], 9 if opciones["optimizar"] else 6),
+        }
+        salida = {}
+        for camino, funcion in caminos.items():
+            inicio = time.perf_counter()
+            salida[camino] = [funcion(qr) for qr in codigos]
+            segundos = time.perf_counter() - inicio
+            iguales = all(np.array_equal(pixeles(a), pixeles(b)) for a, b in zip(salida["PIL"], salida[camino]))
+            print(f"{perfil:<10} {camino:<8} {segundos * 1000 / len(datos):>10.3f} {len(datos) / segundos:>10.0f} "
+                  f"{len(datos) / (segundos + t_matriz):>11.0f} {sum(map(len, salida[camino])) / len(datos):>9.0f} "
+                  f"{'sí' if iguales else 'NO':>8}")
+    print("QR/s total incluye calcular la matriz con qrcode, que es igual en ambos caminos.")
+
+
+if __name__ == "__main__":
+    main()
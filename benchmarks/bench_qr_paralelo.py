@@ -0,0 +1,43 @@
+"""Compara la generación serial contra la paralela de QRs.
+
+Uso: python -m benchmarks.bench_qr_paralelo [--workers N] [--tamanos 100 1000 10000]
+"""
+import argparse
+import random
+import time
+
+from registro.cache_qr import CacheQR
+from registro.qr import renderizar_lote, workers_defecto
+
+
+def datos_sinteticos(n, semilla=0):
+    rnd = random.Random(semilla)
+    return [str(m) for m in rnd.sample(range(1000000, 3000000), n)]
+
+
+def medir(datos, workers):
+    # Caché nueva en cada corrida para medir solo el render
+    cache = CacheQR(max_bytes=1 << 30)
+    inicio = time.perf_counter()
+    renderizar_lote(datos, workers=workers, cache=cache)
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=workers_defecto())
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[100, 1000, 10000])
+    args = parser.parse_args()
+
+    print(f"{'QRs':>7} {'serial (s)':>11} {'QR/s':>8} {'paralelo (s)':>13} {'QR/s':>8} {'x':>6}")
+    for n in args.tamanos:
+        datos = datos_sinteticos(n)
+        t_serial = medir(datos, 1)
+        t_par = medir(datos, args.workers)
+        print(f"{n:>7} {t_serial:>11.2f} {n / t_serial:>8.0f} {t_par:>13.2f} {n / t_par:>8.0f} "
+              f"{t_serial / t_par:>6.2f}")
+    print(f"workers={args.workers}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Tiempo y RSS pico del reporte Excel: libro en memoria contra constant_memory.
+
+"memoria" es la versión anterior (xlsxwriter con in_memory, filtro por hoja e
+itertuples); "streaming" es `escribir_excel_resumen` (constant_memory, filas
+completas con write_row directo a un archivo). Cada modo corre en un
+subproceso para medir su RSS pico por separado y se verifica que las hojas
+salgan iguales.
+Uso: python -m benchmarks.bench_reporte [--equipos 2000 10000 20000] [--sin-verificar]
+"""
+import argparse
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import xlsxwriter
+
+from benchmarks.bench_normalizacion import mismas_hojas
+from benchmarks.sintetico import dataframe_sintetico
+from registro.reporte import COLS_ASESOR, HEADERS_AL, HOJAS_CATEGORIA, escribir_excel_resumen
+from registro.roster import normalizar
+
+
+def reporte_memoria(tablas, ruta):
+    output = io.BytesIO()
+    workbook = xlsxwriter.Workbook(output, {'in_memory': True})
+    header_fmt = workbook.add_format({'bold': True, 'bg_color': '#D3D3D3', 'border': 1})
+    sheet = workbook.add_worksheet("Asesores")
+    sheet.write_row(0, 0, COLS_ASESOR, header_fmt)
+    cols = ["escuela", "nombre", "ap_paterno", "ap_materno", "celular", "correo"]
+    for r, datos in enumerate(tablas["asesores"][cols].itertuples(index=False), start=1):
+        sheet.write_row(r, 0, datos)
+    alumnos = tablas["alumnos"]
+    cols = ["escuela", "equipo", "categoria_reporte", "matricula", "ap_paterno", "ap_materno", "nombre", "correo"]
+    for hoja, maximo in HOJAS_CATEGORIA.items():
+        sheet = workbook.add_worksheet(hoja)
+        sheet.write_row(0, 0, HEADERS_AL, header_fmt)
+        sel = alumnos[(alumnos["categoria_reporte"] == hoja) & (alumnos["slot"] < maximo)]
+        for r, d in enumerate(sel[cols].itertuples(index=False), start=1):
+            sheet.write_row(r, 0, d)
+    workbook.close()
+    with open(ruta, "wb") as f:
+        f.write(output.getvalue())
+
+
+MODOS = {"memoria": reporte_memoria, "streaming": escribir_excel_resumen}
+
+
+def correr_modo(modo, n_equipos, ruta):
+    tablas = normalizar(dataframe_sintetico(n_equipos))
+    rss_base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    inicio = time.perf_counter()
+    MODOS[modo](tablas, ruta)
+    segundos = time.perf_counter() - inicio
+    rss_pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"modo": modo, "alumnos": len(tablas["alumnos"]), "segundos": segundos,
+                      "bytes": os.path.getsize(ruta), "rss_base_kb": rss_base, "rss_pico_kb": rss_pico}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--equipos", type=int, nargs="+", default=[2000, 10000, 20000])
+    parser.add_argument("--sin-verificar", action="store_true", help="No comparar el contenido de los Excel")
+    parser.add_argument("--modo", choices=MODOS)
+    parser.add_argument("--ruta")
+    args = parser.parse_args()
+
+    if args.modo:
+        correr_modo(args.modo, args.equipos[0], args.ruta)
+        return
+
+    print(f"{'equipos':>7} {'alumnos':>8} {'modo':<10} {'tiempo (s)':>11} {'MB':>6} {'RSS extra (MB)':>15} "
+          f"{'RSS pico (MB)':>14} {'idéntico':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.equipos:
+            rutas = {}
+            for modo in MODOS:
+                rutas[modo] = os.path.join(tmp, f"{modo}_{n}.xlsx")
+                salida = subprocess.run([sys.executable, "-m", "benchmarks.bench_reporte", "--modo", modo,
+                                         "--equipos", str(n), "--ruta", rutas[modo]],
+                                        capture_output=True, text=True, check=True)
+                r = json.loads(salida.stdout.strip().splitlines()[-1])
+                igual = ""
+                if modo == "streaming" and not args.sin_verificar:
+                    with open(rutas["memoria"], "rb") as a, open(rutas["streaming"], "rb") as b:
+                        igual = "sí" if mismas_hojas(a.read(), b.read()) else "NO"
+                print(f"{n:>7} {r['alumnos']:>8} {modo:<10} {r['segundos']:>11.2f} {r['bytes'] / 1e6:>6.1f} "
+                      f"{(r['rss_pico_kb'] - r['rss_base_kb']) / 1024:>15.1f} {r['rss_pico_kb'] / 1024:>14.1f} "
+                      f"{igual:>9}")
+
+
+if __name__ == "__main__":
+    main()
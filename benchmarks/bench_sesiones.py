@@ -0,0 +1,229 @@
+"""Carga de varios organizadores usando la app al mismo tiempo.
+
+Levanta `streamlit run app_v5.py` en un puerto libre, con una base SQLite nueva
+por nivel de concurrencia, y conecta N sesiones guionadas por el mismo
+websocket que usa el navegador. Cada sesión sube el Excel maestro, edita el
+texto del correo, genera el ZIP y prepara el reporte. Se reportan los
+percentiles de latencia por paso (del rerun hasta que el script termina) y el
+RSS del servidor (base y pico).
+Con --distintos cada sesión sube su propio archivo; si no, todas suben el
+mismo y deben aprovechar el almacén y las cachés compartidas.
+
+Habla el protocolo interno de Streamlit (protobufs de BackMsg/ForwardMsg), así
+que puede requerir ajustes al cambiar de versión.
+Requiere: pip install websockets psutil
+Uso: python -m benchmarks.bench_sesiones [--sesiones 1 4 8] [--equipos 300] [--distintos] [--archivo maestro.xlsx]
+"""
+import argparse
+import asyncio
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+import uuid
+
+from benchmarks.bench_smtp import puerto_libre
+from benchmarks.sintetico import escribir_excel
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app_v5.py")
+PASOS = ["inicio", "carga", "mensaje", "zip", "reporte"]
+# Etiquetas de los widgets en app_v5.py
+CARGADOR = "📂 Cargar Archivo Excel Maestro (.xlsx)"
+CUERPO = "Cuerpo del correo"
+BOTON_ZIP = "Generar ZIP de Imágenes"
+BOTON_REPORTE = "📊 Preparar Reporte Excel"
+
+
+def percentil(valores, p):
+    # Rango más cercano: con pocas sesiones no se inventan valores intermedios
+    orden = sorted(valores)
+    return orden[max(0, math.ceil(p * len(orden)) - 1)]
+
+
+def iniciar_servidor(puerto, directorio):
+    entorno = {**os.environ, "REGISTRO_DB": os.path.join(directorio, "sesiones.sqlite3"),
+               "REGISTRO_METRICAS": os.devnull}
+    servidor = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", APP, "--server.headless", "true", "--server.port", str(puerto),
+         "--server.enableXsrfProtection", "false", "--browser.gatherUsageStats", "false"],
+        cwd=os.path.dirname(APP), env=entorno, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    limite = time.monotonic() + 60
+    while time.monotonic() < limite:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{puerto}/_stcore/health", timeout=1):
+                return servidor
+        except OSError:
+            time.sleep(0.2)
+    servidor.kill()
+    raise RuntimeError("El servidor de Streamlit no arrancó")
+
+
+def subir_archivo(puerto, url, nombre, contenido):
+    frontera = uuid.uuid4().hex
+    cuerpo = (f'--{frontera}\r\nContent-Disposition: form-data; name="file"; filename="{nombre}"\r\n'
+              f"Content-Type: application/octet-stream\r\n\r\n").encode() + contenido + f"\r\n--{frontera}--\r\n".encode()
+    req = urllib.request.Request(f"http://127.0.0.1:{puerto}{url}", data=cuerpo, method="PUT",
+                                 headers={"Content-Type": f"multipart/form-data; boundary={frontera}"})
+    with urllib.request.urlopen(req, timeout=60):
+        pass
+
+
+class Sesion:
+    """Un navegador simulado: manda reruns con el estado de sus widgets y espera a que el script termine."""
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.id = None
+        self.widgets = {}
+        self.estados = {}
+        self.errores = []
+
+    async def recibir(self, tipo):
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        while True:
+            msg = ForwardMsg()
+            msg.ParseFromString(await self.ws.recv())
+            recibido = msg.WhichOneof("type")
+            if recibido == "new_session": self.id = msg.new_session.initialize.session_id
+            elif recibido == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                elemento = msg.delta.new_element
+                proto = getattr(elemento, elemento.WhichOneof("type"))
+                if elemento.WhichOneof("type") == "exception": self.errores.append(proto.message)
+                elif getattr(proto, "id", None) and hasattr(proto, "label"): self.widgets[proto.label] = proto.id
+            if recibido == tipo: return msg
+
+    async def correr(self, boton=None):
+        """Rerun con los widgets fijados (y el botón presionado); regresa los segundos que tardó."""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+
+        msg = BackMsg()
+        msg.rerun_script.SetInParent()
+        for wid, fijar in self.estados.items():
+            estado = msg.rerun_script.widget_states.widgets.add(id=wid)
+            fijar(estado)
+        if boton: msg.rerun_script.widget_states.widgets.add(id=self.widgets[boton], trigger_value=True)
+        self.widgets = {}
+        inicio = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        await self.recibir("script_finished")
+        return time.perf_counter() - inicio
+
+    async def subir(self, puerto, nombre, contenido):
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+
+        msg = BackMsg()
+        msg.file_urls_request.request_id = uuid.uuid4().hex
+        msg.file_urls_request.file_names.append(nombre)
+        msg.file_urls_request.session_id = self.id
+        await self.ws.send(msg.SerializeToString())
+        urls = (await self.recibir("file_urls_response")).file_urls_response.file_urls[0]
+        await asyncio.to_thread(subir_archivo, puerto, urls.upload_url, nombre, contenido)
+
+        def fijar(estado):
+            info = estado.file_uploader_state_value.uploaded_file_info.add(name=nombre, size=len(contenido),
+                                                                            file_id=urls.file_id)
+            info.file_urls.CopyFrom(urls)
+        self.estados[self.widgets[CARGADOR]] = fijar
+
+
+async def organizador(puerto, contenido, i):
+    """Guion de un organizador; regresa ({paso: segundos}, errores de la app)."""
+    import websockets
+
+    tiempos = {}
+    async with websockets.connect(f"ws://127.0.0.1:{puerto}/_stcore/stream", max_size=None) as ws:
+        sesion = Sesion(ws)
+        tiempos["inicio"] = await sesion.correr()
+        inicio = time.perf_counter()
+        await sesion.subir(puerto, f"maestro_{i}.xlsx", contenido)
+        await sesion.correr()
+        tiempos["carga"] = time.perf_counter() - inicio
+        sesion.estados[sesion.widgets[CUERPO]] = lambda e: setattr(e, "string_value", f"Saludos del organizador {i}.")
+        tiempos["mensaje"] = await sesion.correr()
+        tiempos["zip"] = await sesion.correr(BOTON_ZIP)
+        tiempos["reporte"] = await sesion.correr(BOTON_REPORTE)
+    return tiempos, sesion.errores
+
+
+async def muestrear_rss(pid, pico, parar):
+    import psutil
+
+    proceso = psutil.Process(pid)
+    while not parar.is_set():
+        # El servidor puede tener procesos hijos (pool de QRs); se suman
+        rss = proceso.memory_info().rss + sum(h.memory_info().rss for h in proceso.children(recursive=True))
+        pico[0] = max(pico[0], rss)
+        try:
+            await asyncio.wait_for(parar.wait(), 0.1)
+        except asyncio.TimeoutError:
+            pass
+
+
+def medir_nivel(n, archivos):
+    """Corre n sesiones simultáneas contra un servidor nuevo."""
+    import psutil
+
+    puerto = puerto_libre()
+    with tempfile.TemporaryDirectory() as tmp:
+        servidor = iniciar_servidor(puerto, tmp)
+        try:
+            base = psutil.Process(servidor.pid).memory_info().rss
+
+            async def todo():
+                pico, parar = [base], asyncio.Event()
+                muestreo = asyncio.create_task(muestrear_rss(servidor.pid, pico, parar))
+                inicio = time.perf_counter()
+                resultados = await asyncio.gather(*[organizador(puerto, archivos[i % len(archivos)], i)
+                                                    for i in range(n)])
+                total = time.perf_counter() - inicio
+                parar.set()
+                await muestreo
+                return resultados, total, pico[0]
+
+            resultados, total, pico = asyncio.run(todo())
+        finally:
+            servidor.terminate()
+            servidor.wait(10)
+    return {"resultados": resultados, "total": total, "rss_base": base, "rss_pico": pico}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sesiones", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--equipos", type=int, default=300)
+    parser.add_argument("--archivo", help="Excel real a subir en lugar de uno sintético")
+    parser.add_argument("--distintos", action="store_true", help="Cada sesión sube un archivo diferente")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.archivo: rutas = [args.archivo]
+        else:
+            n_archivos = max(args.sesiones) if args.distintos else 1
+            rutas = [escribir_excel(os.path.join(tmp, f"maestro_{i}.xlsx"), args.equipos, semilla=i)
+                     for i in range(n_archivos)]
+        archivos = []
+        for ruta in rutas:
+            with open(ruta, "rb") as f:
+                archivos.append(f.read())
+
+    print(f"{len(archivos)} archivo(s) de {len(archivos[0]) / 1e6:.2f} MB; servidor: {os.path.basename(APP)}")
+    print(f"{'sesiones':>8} {'paso':<8} {'p50 (s)':>8} {'p90 (s)':>8} {'p99 (s)':>8} {'máx (s)':>8} "
+          f"{'total (s)':>10} {'RSS base (MB)':>14} {'RSS pico (MB)':>14}")
+    for n in args.sesiones:
+        r = medir_nivel(n, archivos)
+        for i, paso in enumerate(PASOS):
+            valores = [tiempos[paso] for tiempos, _ in r["resultados"]]
+            extra = (f" {r['total']:>10.2f} {r['rss_base'] / 2**20:>14.0f} {r['rss_pico'] / 2**20:>14.0f}"
+                     if i == 0 else "")
+            print(f"{n if i == 0 else '':>8} {paso:<8} {percentil(valores, 0.5):>8.2f} {percentil(valores, 0.9):>8.2f} "
+                  f"{percentil(valores, 0.99):>8.2f} {max(valores):>8.2f}{extra}")
+        errores = [e for _, errs in r["resultados"] for e in errs]
+        if errores: print(f"{'':>8} {len(errores)} errores en la app; el primero: {errores[0]}")
+
+
+if __name__ == "__main__":
+    main()
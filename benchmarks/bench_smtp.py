@@ -0,0 +1,112 @@
+"""Rendimiento del despachador SMTP contra un servidor local de prueba (aiosmtpd).
+
+Compara el envío serial original (una conexión + pausa fija) con el pool de
+conexiones bajo distintos límites. `--cortar-cada N` hace que el servidor
+responda 421 cada N mensajes para ejercitar la reconexión.
+
+Requiere: pip install aiosmtpd
+Uso: python -m benchmarks.bench_smtp [--mensajes 60] [--latencia 0.05]
+"""
+import argparse
+import asyncio
+import socket
+import threading
+import time
+from email.message import EmailMessage
+
+from registro.correo import DespachadorCorreo, conectar
+
+
+class Receptor:
+    """Handler de aiosmtpd que cuenta mensajes y simula la latencia del proveedor."""
+
+    def __init__(self, latencia=0.0, cortar_cada=0):
+        self.latencia = latencia
+        self.cortar_cada = cortar_cada
+        self.recibidos = 0
+        self.intentos = 0
+        self._lock = threading.Lock()
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.latencia: await asyncio.sleep(self.latencia)
+        with self._lock:
+            self.intentos += 1
+            if self.cortar_cada and self.intentos % self.cortar_cada == 0:
+                return "421 Sesión cerrada por el servidor"
+            self.recibidos += 1
+        return "250 OK"
+
+
+def puerto_libre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def mensajes_prueba(n, adjunto_bytes=3000):
+    adjunto = bytes(range(256)) * (adjunto_bytes // 256)
+    for i in range(n):
+        msg = EmailMessage()
+        msg["Subject"] = f"Prueba {i}"
+        msg["From"] = "torneo@example.com"
+        msg["To"] = f"coach{i}@example.com"
+        msg.set_content("Adjuntos de prueba")
+        for j in range(5):
+            msg.add_attachment(adjunto, maintype="image", subtype="png", filename=f"Alumno_{i}_{j}.png")
+        yield msg
+
+
+def serial_original(port, mensajes, pausa):
+    server = conectar("127.0.0.1", port, "ninguna")
+    for msg in mensajes:
+        server.send_message(msg)
+        time.sleep(pausa)
+    server.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mensajes", type=int, default=60)
+    parser.add_argument("--latencia", type=float, default=0.05, help="Segundos que tarda el servidor por mensaje")
+    parser.add_argument("--pausa", type=float, default=1.5, help="Pausa fija del envío original")
+    parser.add_argument("--cortar-cada", type=int, default=0)
+    args = parser.parse_args()
+
+    from aiosmtpd.controller import Controller
+
+    receptor = Receptor(args.latencia, args.cortar_cada)
+    port = puerto_libre()
+    controlador = Controller(receptor, hostname="127.0.0.1", port=port)
+    controlador.start()
+    try:
+        casos = [
+            ("original (pausa fija)", lambda msgs: serial_original(port, msgs, args.pausa)),
+            ("pool 1, sin límite", dict(conexiones=1)),
+            ("pool 4, sin límite", dict(conexiones=4)),
+            ("pool 4, 10/s", dict(conexiones=4, por_segundo=10)),
+            ("pool 4, 2/s, 60/min", dict(conexiones=4, por_segundo=2, por_minuto=60)),
+        ]
+        print(f"{'caso':<24} {'tiempo (s)':>11} {'msg/s':>7} {'recibidos':>10} {'fallidos':>9}")
+        for nombre, caso in casos:
+            receptor.recibidos = receptor.intentos = 0
+            msgs = list(mensajes_prueba(args.mensajes))
+            fallidos = 0
+            inicio = time.perf_counter()
+            if callable(caso):
+                try:
+                    caso(msgs)
+                except Exception:
+                    # El ciclo original se detiene en el primer error
+                    fallidos = args.mensajes - receptor.recibidos
+            else:
+                with DespachadorCorreo("127.0.0.1", port, "ninguna", **caso) as despachador:
+                    fallidos = sum(1 for _, error in despachador.enviar(msgs) if error)
+            segundos = time.perf_counter() - inicio
+            print(f"{nombre:<24} {segundos:>11.2f} {args.mensajes / segundos:>7.1f} "
+                  f"{receptor.recibidos:>10} {fallidos:>9}")
+    finally:
+        controlador.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""Tiempo y tamaño del ZIP de QRs en cada modo de compresión.
+
+Uso: python -m benchmarks.bench_zip_compresion [--equipos 1000]
+"""
+import argparse
+import time
+
+from benchmarks.sintetico import dataframe_sintetico
+from registro.exportar import MODOS_ZIP, escribir_zip
+from registro.qr import renderizar_lote
+from registro.roster import leer_equipos, normalizar
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--equipos", type=int, default=1000)
+    parser.add_argument("--niveles", type=int, nargs="+", default=[1, 6, 9])
+    args = parser.parse_args()
+
+    equipos = leer_equipos(normalizar(dataframe_sintetico(args.equipos)))
+    # Calentar la caché: solo se mide la construcción del archivo
+    renderizar_lote([img["dato"] for e in equipos for img in e["Imagenes"]])
+
+    print(f"{'modo':<10} {'nivel':>5} {'tiempo (s)':>11} {'ZIP (KB)':>9}")
+    for modo in MODOS_ZIP:
+        for nivel in ([None] if modo == "stored" else args.niveles):
+            inicio = time.perf_counter()
+            with escribir_zip(equipos, modo=modo, nivel=nivel or 6) as archivo:
+                tam = len(archivo.read())
+            segundos = time.perf_counter() - inicio
+            print(f"{modo:<10} {nivel or '-':>5} {segundos:>11.3f} {tam / 1024:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
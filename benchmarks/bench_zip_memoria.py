@@ -0,0 +1,71 @@
+"""RSS pico al construir el ZIP de QRs: BytesIO + getvalue() contra archivo temporal.
+
+Cada modo corre en un subproceso para que el pico de RSS no se contamine.
+Uso: python -m benchmarks.bench_zip_memoria [--equipos 600]
+"""
+import argparse
+import io
+import json
+import resource
+import subprocess
+import sys
+import time
+import zipfile
+
+from benchmarks.sintetico import dataframe_sintetico
+from registro.exportar import escribir_zip
+from registro.qr import iterar_imagenes, renderizar_lote
+from registro.roster import leer_equipos, normalizar
+
+
+def zip_bytesio(equipos):
+    b = io.BytesIO()
+    with zipfile.ZipFile(b, "w", zipfile.ZIP_DEFLATED) as z:
+        for eq, imgs in iterar_imagenes(equipos):
+            for nombre, png in imgs:
+                z.writestr(f"{eq['Carpeta']}/{nombre}", png)
+    return b.getvalue()
+
+
+def zip_temporal(equipos):
+    with escribir_zip(equipos) as archivo:
+        return archivo.read()
+
+
+MODOS = {"bytesio": zip_bytesio, "temporal": zip_temporal}
+
+
+def correr_modo(modo, n_equipos):
+    equipos = leer_equipos(normalizar(dataframe_sintetico(n_equipos)))
+    # Calentar la caché para medir solo la construcción del ZIP
+    renderizar_lote([img["dato"] for e in equipos for img in e["Imagenes"]])
+    rss_base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    inicio = time.perf_counter()
+    datos = MODOS[modo](equipos)
+    segundos = time.perf_counter() - inicio
+    rss_pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"modo": modo, "segundos": segundos, "zip_bytes": len(datos),
+                      "rss_base_kb": rss_base, "rss_pico_kb": rss_pico}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--equipos", type=int, default=600)
+    parser.add_argument("--modo", choices=MODOS)
+    args = parser.parse_args()
+
+    if args.modo:
+        correr_modo(args.modo, args.equipos)
+        return
+
+    print(f"{'modo':<9} {'tiempo (s)':>11} {'ZIP (KB)':>9} {'RSS extra (MB)':>15} {'RSS pico (MB)':>14}")
+    for modo in MODOS:
+        salida = subprocess.run([sys.executable, "-m", "benchmarks.bench_zip_memoria", "--modo", modo,
+                                 "--equipos", str(args.equipos)], capture_output=True, text=True, check=True)
+        r = json.loads(salida.stdout.strip().splitlines()[-1])
+        print(f"{modo:<9} {r['segundos']:>11.2f} {r['zip_bytes'] / 1024:>9.0f} "
+              f"{(r['rss_pico_kb'] - r['rss_base_kb']) / 1024:>15.1f} {r['rss_pico_kb'] / 1024:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
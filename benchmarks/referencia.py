@@ -0,0 +1,106 @@
+"""Implementaciones originales (fila por fila) para comparar resultados y tiempos."""
+import io
+from email.message import EmailMessage
+
+import xlsxwriter
+
+from registro.qr import imagenes_equipo
+from registro.roster import limpiar_dato
+
+
+def generar_excel_resumen(df_original):
+    output = io.BytesIO()
+    workbook = xlsxwriter.Workbook(output, {'in_memory': True})
+    header_fmt = workbook.add_format({'bold': True, 'bg_color': '#D3D3D3', 'border': 1})
+
+    sheet_asesores = workbook.add_worksheet("Asesores")
+    cols_asesor = ["Escuela", "Nombre", "Ap. Paterno", "Ap. Materno", "Celular", "Correo"]
+    for c, val in enumerate(cols_asesor): sheet_asesores.write(0, c, val, header_fmt)
+
+    asesores_unicos = set()
+    row_asesor = 1
+    for _, row in df_original.iterrows():
+        nombre = limpiar_dato(row.iloc[5])
+        celular = limpiar_dato(row.iloc[8])
+        if nombre and (nombre, celular) not in asesores_unicos:
+            asesores_unicos.add((nombre, celular))
+            datos = [limpiar_dato(row.iloc[1]), nombre, limpiar_dato(row.iloc[6]),
+                     limpiar_dato(row.iloc[7]), celular, limpiar_dato(row.iloc[9])]
+            for c, val in enumerate(datos): sheet_asesores.write(row_asesor, c, val)
+            row_asesor += 1
+
+    config_pos = [[10, 11, 12, 13, 16], [17, 18, 19, 20, 23], [24, 25, 26, 27, 30],
+                  [31, 32, 33, 34, 37], [39, 40, 41, 42, 45]]
+    headers_al = ["Escuela", "Equipo", "Categoría", "Matrícula", "Ap. Paterno", "Ap. Materno", "Nombre", "Correo Inst."]
+
+    sheets = {
+        "Línea":      {"obj": workbook.add_worksheet("Línea"), "row": 1, "max": 4},
+        "Laberinto":  {"obj": workbook.add_worksheet("Laberinto"), "row": 1, "max": 4},
+        "Escenario":  {"obj": workbook.add_worksheet("Escenario"), "row": 1, "max": 5},
+    }
+    for k in sheets:
+        for c, val in enumerate(headers_al): sheets[k]["obj"].write(0, c, val, header_fmt)
+
+    for _, row in df_original.iterrows():
+        escuela = limpiar_dato(row.iloc[1])
+        equipo = limpiar_dato(row.iloc[3])
+        cat_txt = limpiar_dato(row.iloc[4])
+        if not escuela or not equipo: continue
+
+        target = None
+        if "línea" in cat_txt.lower() or "linea" in cat_txt.lower(): target = "Línea"
+        elif "laberinto" in cat_txt.lower(): target = "Laberinto"
+        elif "escenario" in cat_txt.lower(): target = "Escenario"
+
+        if target:
+            cfg = sheets[target]
+            for i in range(cfg["max"]):
+                idx = config_pos[i]
+                if idx[0] < len(row):
+                    mat = limpiar_dato(row.iloc[idx[0]])
+                    if mat:
+                        d = [escuela, equipo, target, mat, limpiar_dato(row.iloc[idx[1]]),
+                             limpiar_dato(row.iloc[idx[2]]), limpiar_dato(row.iloc[idx[3]]),
+                             limpiar_dato(row.iloc[idx[4]])]
+                        for c, v in enumerate(d): cfg["obj"].write(cfg["row"], c, v)
+                        cfg["row"] += 1
+    workbook.close()
+    return output.getvalue(), len(asesores_unicos)
+
+
+def leer_equipos(df):
+    equipos = []
+    cols_mat = [10, 17, 24, 31, 39]
+    for _, row in df.iterrows():
+        esc = limpiar_dato(row.iloc[1])
+        eq = limpiar_dato(row.iloc[3])
+        cat = limpiar_dato(row.iloc[4])
+        if not esc or not eq: continue
+
+        nom_carpeta = "".join([c if c.isalnum() or c in " -_" else "-" for c in f"{esc} {eq} {cat}".strip()])
+        cel_coach = limpiar_dato(row.iloc[8])
+        mail_coach = limpiar_dato(row.iloc[9])
+
+        imgs = []
+        if cel_coach: imgs.append({"name": f"Coach_{cel_coach}.png", "dato": cel_coach})
+
+        max_al = 5 if "escenario" in str(cat).lower() else 4
+        for i, c_idx in enumerate(cols_mat):
+            if i >= max_al: break
+            if c_idx < len(row):
+                mat = limpiar_dato(row.iloc[c_idx])
+                if mat: imgs.append({"name": f"Alumno_{mat}.png", "dato": mat})
+
+        equipos.append({"Carpeta": nom_carpeta, "Equipo": eq, "Correo": mail_coach, "Imagenes": imgs})
+    return equipos
+
+
+def construir_mensaje(eq, remitente, asunto_base, cuerpo):
+    msg = EmailMessage()
+    msg['Subject'] = f"{asunto_base} - {eq['Equipo']}"
+    msg['From'] = remitente
+    msg['To'] = eq['Correo']
+    msg.set_content(cuerpo)
+    for nombre, png in imagenes_equipo(eq):
+        msg.add_attachment(png, maintype='image', subtype='png', filename=nombre)
+    return msg
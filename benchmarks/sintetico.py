@@ -0,0 +1,72 @@
+"""Datos de torneo sintéticos con el mismo layout posicional del Excel maestro."""
+import random
+import unicodedata
+
+import pandas as pd
+
+# Inicio de cada bloque de alumno: matrícula, ap. paterno, ap. materno, nombre, semestre, fecha, correo
+BLOQUES_ALUMNO = [10, 17, 24, 31, 39]
+N_COLUMNAS = 47
+CATEGORIAS = ["Línea", "Laberinto", "Escenario"]
+NOMBRES = ["Ana", "Luis", "Sofía", "Carlos", "María", "Jorge", "Valeria", "Diego", "Fernanda", "Rubén"]
+APELLIDOS = ["García", "López", "Hernández", "Martínez", "Sánchez", "Pérez", "Gómez", "Dávila", "Tirado", "Cedillo"]
+
+
+def _ascii(txt):
+    return unicodedata.normalize("NFKD", txt).encode("ascii", "ignore").decode().lower()
+
+
+def dataframe_sintetico(n_equipos, semilla=0, mezcla=None, duplicados=0.0, repetidos=0.0):
+    """DataFrame equivalente al que regresa `cargar_dataframe` (sin fila de encabezados).
+
+    `mezcla` da el peso de cada categoría (p. ej. {"Escenario": 2, "Línea": 1});
+    por defecto las tres pesan igual. `duplicados` es la fracción de alumnos que
+    ya venían en otro equipo (misma matrícula y datos) y `repetidos` la de
+    equipos que aparecen dos veces, como cuando se reenvía el formulario.
+    """
+    rnd = random.Random(semilla)
+    matriculas = iter(rnd.sample(range(1000000, 3000000), n_equipos * 5))
+    escuelas = [f"Preparatoria {i}" for i in range(1, max(2, n_equipos // 20) + 1)]
+    coaches = []
+    for i in range(max(1, n_equipos // 2)):
+        nombre = rnd.choice(NOMBRES)
+        coaches.append([nombre, rnd.choice(APELLIDOS), rnd.choice(APELLIDOS),
+                        8110000000 + i, f"{_ascii(nombre)}.coach{i}@uanl.edu.mx"])
+
+    filas = []
+    inscritos = []
+    for n in range(n_equipos):
+        fila = [None] * N_COLUMNAS
+        cat = rnd.choices(list(mezcla), weights=list(mezcla.values()))[0] if mezcla else rnd.choice(CATEGORIAS)
+        fila[0] = 46000.5 + n
+        fila[1] = rnd.choice(escuelas)
+        fila[3] = f"Equipo {n}"
+        fila[4] = cat
+        fila[5:10] = rnd.choice(coaches)
+        for i, col in enumerate(BLOQUES_ALUMNO):
+            if i == 4 and cat != "Escenario": break
+            if duplicados and inscritos and rnd.random() < duplicados:
+                fila[col:col + 7] = rnd.choice(inscritos)
+                continue
+            nombre = rnd.choice(NOMBRES)
+            fila[col:col + 7] = [next(matriculas), rnd.choice(APELLIDOS), rnd.choice(APELLIDOS), nombre,
+                                 "Cuarto", 39900 + rnd.randint(0, 400), f"{_ascii(nombre)}{n}_{i}@uanl.edu.mx"]
+            if duplicados: inscritos.append(fila[col:col + 7])
+        fila[38] = "Si" if cat == "Escenario" else "No"
+        fila[46] = "https://drive.google.com/open?id=oficio"
+        filas.append(fila)
+        if repetidos and rnd.random() < repetidos:
+            # El reenvío llega un poco después con los mismos datos
+            filas.append([fila[0] + 0.01] + fila[1:])
+    return pd.DataFrame(filas, columns=range(N_COLUMNAS))
+
+
+def escribir_excel(ruta, n_equipos, semilla=0, **opciones):
+    """Guarda un Excel maestro sintético (con fila de encabezados) en `ruta`.
+
+    `opciones` se pasan a `dataframe_sintetico` (mezcla, duplicados, repetidos).
+    """
+    df = dataframe_sintetico(n_equipos, semilla, **opciones)
+    encabezados = pd.DataFrame([[f"Columna {c + 1}" for c in range(N_COLUMNAS)]])
+    pd.concat([encabezados, df]).to_excel(ruta, header=False, index=False, engine="xlsxwriter")
+    return ruta
@@ -0,0 +1 @@
+# Lógica compartida del sistema de registro (QRs, reportes y correos).
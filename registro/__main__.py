@@ -0,0 +1,5 @@
+import sys
+
+from registro.cli import main
+
+sys.exit(main())
@@ -0,0 +1,84 @@
+import time
+
+import pandas as pd
+
+from registro.db import obtener_base, por_proceso
+
+# Columnas de cada tabla de `normalizar`, en su orden original
+COLUMNAS = {
+    "equipos": ["fila", "escuela", "equipo", "categoria", "celular_coach", "correo_coach", "nombre_coach",
+                "carpeta", "categoria_reporte", "limite_qr"],
+    "asesores": ["escuela", "nombre", "ap_paterno", "ap_materno", "celular", "correo"],
+    "alumnos": ["fila", "slot", "matricula", "ap_paterno", "ap_materno", "nombre", "correo", "escuela",
+                "equipo", "categoria_reporte"],
+}
+ENTEROS = {"fila", "slot", "limite_qr"}
+
+
+def _esquema():
+    tablas = ["CREATE TABLE IF NOT EXISTS torneos (huella TEXT PRIMARY KEY, creado REAL NOT NULL, "
+              "n_equipos INTEGER NOT NULL);"]
+    for nombre, columnas in COLUMNAS.items():
+        defs = ", ".join(f"{c} {'INTEGER' if c in ENTEROS else 'TEXT'} NOT NULL" for c in columnas)
+        tablas.append(f"CREATE TABLE IF NOT EXISTS {nombre} (huella TEXT NOT NULL, orden INTEGER NOT NULL, {defs}, "
+                      f"PRIMARY KEY (huella, orden));")
+    return "\n".join(tablas)
+
+
+class AlmacenTorneo:
+    """Tablas normalizadas de cada archivo cargado, guardadas una vez en SQLite.
+
+    La llave es la huella SHA-256 del archivo: cualquier sesión (o un reinicio
+    del servidor) que cargue el mismo archivo lee las tablas de aquí en lugar
+    de volver a parsear el Excel.
+    """
+
+    def __init__(self, ruta=None):
+        base = obtener_base(ruta)
+        self._con, self._lock = base.con, base.lock
+        base.esquema(_esquema())
+
+    def existe(self, huella):
+        with self._lock:
+            return self._con.execute("SELECT 1 FROM torneos WHERE huella = ?", (huella,)).fetchone() is not None
+
+    def guardar(self, huella, tablas):
+        """Reemplaza las tablas de `huella` en una sola transacción."""
+        with self._lock:
+            cur = self._con.cursor()
+            cur.execute("BEGIN")
+            try:
+                for nombre, columnas in COLUMNAS.items():
+                    df = tablas[nombre].reset_index() if nombre == "equipos" else tablas[nombre]
+                    cur.execute(f"DELETE FROM {nombre} WHERE huella = ?", (huella,))
+                    cur.executemany(
+                        f"INSERT INTO {nombre} (huella, orden, {', '.join(columnas)}) "
+                        f"VALUES (?, ?, {', '.join('?' * len(columnas))})",
+                        ((huella, i, *fila) for i, fila in enumerate(
+                            df[columnas].astype({c: int for c in columnas if c in ENTEROS}).itertuples(index=False))))
+                cur.execute("INSERT OR REPLACE INTO torneos (huella, creado, n_equipos) VALUES (?, ?, ?)",
+                            (huella, time.time(), len(tablas["equipos"])))
+                cur.execute("COMMIT")
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+
+    def cargar(self, huella):
+        """Las mismas tablas que regresó `normalizar`, o None si no existe."""
+        if not self.existe(huella): return None
+        tablas = {}
+        with self._lock:
+            for nombre, columnas in COLUMNAS.items():
+                df = pd.read_sql_query(f"SELECT {', '.join(columnas)} FROM {nombre} WHERE huella = ? ORDER BY orden",
+                                       self._con, params=(huella,))
+                tablas[nombre] = df.astype({c: "int64" for c in columnas if c in ENTEROS})
+        tablas["equipos"] = tablas["equipos"].set_index("fila")
+        return tablas
+
+    def torneos(self):
+        with self._lock:
+            return self._con.execute("SELECT huella, creado, n_equipos FROM torneos ORDER BY creado DESC").fetchall()
+
+
+# Almacén único por proceso, compartido por todas las sesiones
+obtener_almacen = por_proceso(AlmacenTorneo)
@@ -0,0 +1,107 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from registro.db import por_proceso
+
+# Límite por defecto de la memoria ocupada por PNGs en caché (bytes)
+MAX_BYTES_DEFECTO = 64 * 1024 * 1024
+
+
+class CacheQR:
+    """Caché LRU de PNGs de QR con un nivel opcional en disco."""
+
+    def __init__(self, max_bytes=MAX_BYTES_DEFECTO, directorio=None):
+        self.max_bytes = max_bytes
+        self.directorio = directorio
+        self._datos = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.aciertos_disco = 0
+        self.fallos = 0
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+
+    @staticmethod
+    def llave(dato, *opciones):
+        base = "\x1f".join(str(p) for p in (dato, *opciones))
+        return hashlib.sha256(base.encode("utf-8")).hexdigest()
+
+    def _ruta(self, llave):
+        return os.path.join(self.directorio, llave[:2], f"{llave}.png")
+
+    def obtener(self, llave):
+        with self._lock:
+            png = self._datos.get(llave)
+            if png is not None:
+                self._datos.move_to_end(llave)
+                self.aciertos += 1
+                return png
+        if self.directorio:
+            try:
+                with open(self._ruta(llave), "rb") as f:
+                    png = f.read()
+            except OSError:
+                png = None
+            if png is not None:
+                with self._lock:
+                    self.aciertos_disco += 1
+                self._guardar_memoria(llave, png)
+                return png
+        with self._lock:
+            self.fallos += 1
+        return None
+
+    def guardar(self, llave, png):
+        self._guardar_memoria(llave, png)
+        if self.directorio:
+            ruta = self._ruta(llave)
+            if not os.path.exists(ruta):
+                os.makedirs(os.path.dirname(ruta), exist_ok=True)
+                tmp = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+                try:
+                    with open(tmp, "wb") as f:
+                        f.write(png)
+                    os.replace(tmp, ruta)
+                except OSError:
+                    # El disco es solo un nivel extra; si falla seguimos en memoria
+                    if os.path.exists(tmp): os.remove(tmp)
+
+    def _guardar_memoria(self, llave, png):
+        if len(png) > self.max_bytes: return
+        with self._lock:
+            anterior = self._datos.pop(llave, None)
+            if anterior is not None: self._bytes -= len(anterior)
+            self._datos[llave] = png
+            self._bytes += len(png)
+            # Expulsar los menos usados hasta respetar el límite
+            while self._bytes > self.max_bytes:
+                _, viejo = self._datos.popitem(last=False)
+                self._bytes -= len(viejo)
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+            self._bytes = 0
+
+    def estadisticas(self):
+        with self._lock:
+            return {
+                "aciertos": self.aciertos,
+                "aciertos_disco": self.aciertos_disco,
+                "fallos": self.fallos,
+                "entradas": len(self._datos),
+                "bytes": self._bytes,
+            }
+
+
+def _crear_cache():
+    max_mb = int(os.environ.get("REGISTRO_QR_CACHE_MB", MAX_BYTES_DEFECTO // (1024 * 1024)))
+    directorio = os.environ.get("REGISTRO_QR_CACHE_DIR") or None
+    return CacheQR(max_mb * 1024 * 1024, directorio)
+
+
+# Caché única por proceso: compartida entre reruns y sesiones de Streamlit
+obtener_cache = por_proceso(_crear_cache)
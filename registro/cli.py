@@ -0,0 +1,191 @@
+"""Pipeline de registro sin navegador: ZIP de QRs, reporte Excel y envío de correos.
+
+Uso:
+  python -m registro build-zip REGISTRO.xlsx -o QRs_Torneo.zip
+  python -m registro report REGISTRO.xlsx -o Reporte_Torneo_Vertical.xlsx
+  python -m registro send REGISTRO.xlsx --proveedor Gmail --usuario torneo@gmail.com
+  python -m registro send --reanudar 12
+
+La contraseña de aplicación se lee de la variable REGISTRO_SMTP_CONTRASENA (o la
+que indique --contrasena-env); si no existe y hay terminal, se pide.
+Códigos de salida: 0 éxito, 1 error, 2 uso incorrecto, 3 envío incompleto
+(errores, pendientes o sin confirmar), 130 interrumpido.
+"""
+import argparse
+import getpass
+import os
+import sys
+import time
+
+from registro.correo import CONEXIONES_DEFECTO, LIMITES, PROVEEDORES, duracion_estimada
+from registro.exportar import MODOS_ZIP
+from registro.paquetes import ADJUNTOS, agrupar_por_coach
+from registro.pipeline import (ASUNTO_DEFECTO, CUERPO_DEFECTO, cargar_torneo, con_correo, construir_reporte,
+                               construir_zip, enviar_correos)
+from registro.qr import PERFILES
+from registro.roster import leer_equipos
+from registro.trabajos import obtener_cola
+from registro.versiones import obtener_historial
+
+EXITO, ERROR, USO, INCOMPLETO, INTERRUMPIDO = 0, 1, 2, 3, 130
+
+
+def _avisar(texto):
+    print(texto, flush=True)
+
+
+def _cargar(args):
+    with open(args.archivo, "rb") as f:
+        huella, tablas, origen = cargar_torneo(f.read())
+    equipos = leer_equipos(tablas)
+    _avisar(f"Archivo {huella[:12]} ({'almacén' if origen == 'almacen' else 'leído'}): {len(equipos)} equipos")
+    # Igual que en la app: cada archivo queda registrado para comparar la siguiente revisión
+    cambios = obtener_historial().cambios(huella, equipos)
+    if cambios is not None:
+        _avisar(f"Cambios: {len(cambios['agregados'])} agregados · {len(cambios['modificados'])} modificados · "
+                f"{len(cambios['eliminados'])} eliminados · {cambios['sin_cambio']} sin cambios")
+    if getattr(args, "solo_cambios", False):
+        if cambios is None: _avisar("Sin versión anterior: se usan todos los equipos")
+        else: equipos = cambios["cambiados"]
+    return huella, tablas, equipos
+
+
+def build_zip(args):
+    _, _, equipos = _cargar(args)
+    inicio = time.perf_counter()
+    resumen = construir_zip(equipos, args.salida, modo=args.compresion, nivel=args.nivel, perfil=args.perfil,
+                            progreso=lambda hechos, total: _avisar(f"[zip] {hechos}/{total} equipos"))
+    _avisar(f"ZIP escrito en {args.salida}: {resumen['bytes'] / 1e6:.1f} MB, {resumen['referencias']} QRs "
+            f"({resumen['distintos']} distintos, {resumen.get('renderizados', 0)} generados) "
+            f"en {time.perf_counter() - inicio:.1f} s")
+    return EXITO
+
+
+def report(args):
+    _, tablas, _ = _cargar(args)
+    n_asesores = construir_reporte(tablas, args.salida)
+    _avisar(f"Reporte escrito en {args.salida}: {n_asesores} asesores únicos")
+    return EXITO
+
+
+def _contrasena(args):
+    contrasena = os.environ.get(args.contrasena_env)
+    if contrasena is None and sys.stdin.isatty(): contrasena = getpass.getpass("Contraseña de aplicación: ")
+    return contrasena
+
+
+def send(args):
+    if args.reanudar is None and args.archivo is None:
+        print("Indica el archivo Excel o --reanudar ID.", file=sys.stderr)
+        return USO
+    if args.reanudar is None and not args.usuario:
+        print("Falta --usuario para un envío nuevo.", file=sys.stderr)
+        return USO
+    if args.reanudar is not None:
+        t = obtener_cola().trabajo(args.reanudar)
+        if t is None:
+            print(f"No existe el envío #{args.reanudar}.", file=sys.stderr)
+            return ERROR
+        # Se reanuda con la cuenta guardada; otra cuenta sería otro remitente a medio envío
+        if args.usuario and args.usuario != t["usuario"]:
+            print(f"El envío #{args.reanudar} es de {t['usuario']}, no de {args.usuario}.", file=sys.stderr)
+            return USO
+    contrasena = _contrasena(args)
+    if not contrasena:
+        print(f"Falta la contraseña: define {args.contrasena_env}.", file=sys.stderr)
+        return USO
+
+    ultimo = {}
+
+    def progreso(r):
+        hechos = (r["enviado"], r["error"], r["incierto"])
+        if hechos == ultimo.get("hechos"): return
+        ultimo["hechos"] = hechos
+        _avisar(f"[envío] {r['enviado']}/{r['total']} enviados · {r['error']} errores · {r['incierto']} sin confirmar")
+
+    if args.reanudar is not None:
+        tid, r = enviar_correos(None, t["proveedor"], t["usuario"], contrasena, tid=args.reanudar,
+                                reintentar_errores=args.reintentar_errores, progreso=progreso)
+    else:
+        huella, _, equipos = _cargar(args)
+        validos = con_correo(equipos)
+        _avisar(f"{len(validos)} equipos con correo de coach")
+        if not validos:
+            _avisar("No hay cambios que enviar." if args.solo_cambios else "No hay equipos a los cuales enviar.")
+            return EXITO
+        if args.agrupar:
+            destinatarios = agrupar_por_coach(validos)
+            por_segundo = args.por_segundo or LIMITES[args.proveedor][0]
+            por_minuto = args.por_minuto or LIMITES[args.proveedor][1]
+            ahorro = (duracion_estimada(len(validos), por_segundo, por_minuto)
+                      - duracion_estimada(len(destinatarios), por_segundo, por_minuto))
+            _avisar(f"Agrupado por coach: {len(destinatarios)} correos ({len(validos) - len(destinatarios)} menos, "
+                    f"≈ {ahorro / 60:.1f} min menos con el límite del proveedor)")
+            validos = destinatarios
+        cuerpo = CUERPO_DEFECTO
+        if args.cuerpo_archivo:
+            with open(args.cuerpo_archivo, encoding="utf-8") as f:
+                cuerpo = f.read()
+        opciones = {"conexiones": args.conexiones, "adjuntos": args.adjuntos, "perfil": args.perfil}
+        if args.por_segundo: opciones["por_segundo"] = args.por_segundo
+        if args.por_minuto: opciones["por_minuto"] = args.por_minuto
+        tid, r = enviar_correos(validos, args.proveedor, args.usuario, contrasena, args.asunto, cuerpo,
+                                huella=huella, progreso=progreso, **opciones)
+
+    _avisar(f"Envío #{tid} {r['estado']}: {r['enviado']} de {r['total']} enviados, {r['error']} errores, "
+            f"{r['incierto']} sin confirmar, {r['pendiente']} pendientes")
+    if r["mensaje"]:
+        print(f"Error de conexión: {r['mensaje']}", file=sys.stderr)
+        return ERROR
+    return EXITO if r["enviado"] == r["total"] else INCOMPLETO
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(prog="registro", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p = sub.add_parser("build-zip", help="ZIP con los QRs por carpeta de equipo")
+    p.add_argument("archivo")
+    p.add_argument("-o", "--salida", default="QRs_Torneo.zip")
+    p.add_argument("--compresion", choices=list(MODOS_ZIP), default="stored")
+    p.add_argument("--nivel", type=int, choices=range(1, 10), default=6, metavar="1-9")
+    p.add_argument("--perfil", choices=list(PERFILES), default="original")
+    p.add_argument("--solo-cambios", action="store_true", help="Solo equipos nuevos o modificados")
+    p.set_defaults(funcion=build_zip)
+
+    p = sub.add_parser("report", help="Excel clasificado por categoría")
+    p.add_argument("archivo")
+    p.add_argument("-o", "--salida", default="Reporte_Torneo_Vertical.xlsx")
+    p.set_defaults(funcion=report)
+
+    p = sub.add_parser("send", help="Correo a cada coach con los QRs de su equipo")
+    p.add_argument("archivo", nargs="?")
+    p.add_argument("--usuario", help="Cuenta remitente; con --reanudar se usa la del envío guardado")
+    p.add_argument("--proveedor", choices=list(PROVEEDORES), default="Gmail")
+    p.add_argument("--contrasena-env", default="REGISTRO_SMTP_CONTRASENA")
+    p.add_argument("--asunto", default=ASUNTO_DEFECTO)
+    p.add_argument("--cuerpo-archivo", help="Texto del correo (UTF-8)")
+    p.add_argument("--conexiones", type=int, default=CONEXIONES_DEFECTO)
+    p.add_argument("--por-segundo", type=float, help="Por defecto, el límite del proveedor")
+    p.add_argument("--por-minuto", type=int, help="Por defecto, el límite del proveedor")
+    p.add_argument("--adjuntos", choices=list(ADJUNTOS.values()), default="png")
+    p.add_argument("--perfil", choices=list(PERFILES), default="original")
+    p.add_argument("--solo-cambios", action="store_true", help="Solo equipos nuevos o modificados")
+    p.add_argument("--agrupar", action="store_true", help="Un solo correo por coach con todos sus equipos")
+    p.add_argument("--reanudar", type=int, metavar="ID", help="Reanudar un envío existente")
+    p.add_argument("--reintentar-errores", action="store_true", help="Con --reanudar, reenviar también los errores")
+    p.set_defaults(funcion=send)
+    return parser
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    try:
+        return args.funcion(args)
+    except KeyboardInterrupt:
+        print("Interrumpido.", file=sys.stderr)
+        return INTERRUMPIDO
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return ERROR
@@ -0,0 +1,184 @@
+import os
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from registro.mime import MensajeCrudo
+
+# host, puerto, seguridad ("ssl", "starttls" o "ninguna")
+PROVEEDORES = {
+    "Gmail": ("smtp.gmail.com", 465, "ssl"),
+    "Outlook": ("smtp.office365.com", 587, "starttls"),
+    "Yahoo": ("smtp.mail.yahoo.com", 465, "ssl"),
+}
+# Límites conservadores por proveedor: (mensajes por segundo, mensajes por minuto)
+LIMITES = {
+    "Gmail": (1.0, 40),
+    "Outlook": (0.5, 30),
+    "Yahoo": (0.5, 20),
+}
+# Servidor SMTP local para pruebas (p. ej. aiosmtpd): REGISTRO_SMTP_PRUEBA=127.0.0.1:8025
+if os.environ.get("REGISTRO_SMTP_PRUEBA"):
+    _host, _port = os.environ["REGISTRO_SMTP_PRUEBA"].rsplit(":", 1)
+    PROVEEDORES["Prueba local"] = (_host, int(_port), "ninguna")
+    LIMITES["Prueba local"] = (20.0, 600)
+CONEXIONES_DEFECTO = 3
+REINTENTOS = 2
+# Errores que indican que la sesión se cayó y vale la pena reconectar
+ERRORES_CONEXION = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, TimeoutError)
+
+
+def es_error_conexion(e):
+    # 421: el servidor cierra el canal (límite de sesión, mantenimiento, etc.)
+    return isinstance(e, ERRORES_CONEXION) or getattr(e, "smtp_code", None) == 421
+
+
+class CuboTokens:
+    """Token bucket: `tasa` tokens por segundo con ráfagas de hasta `capacidad`."""
+
+    def __init__(self, tasa, capacidad):
+        self.tasa = tasa
+        self.capacidad = capacidad
+        self._tokens = capacidad
+        self._ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def tomar(self):
+        while True:
+            with self._lock:
+                ahora = time.monotonic()
+                self._tokens = min(self.capacidad, self._tokens + (ahora - self._ultimo) * self.tasa)
+                self._ultimo = ahora
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                espera = (1 - self._tokens) / self.tasa
+            time.sleep(espera)
+
+
+class LimiteEnvio:
+    """Límite combinado de mensajes por segundo y por minuto (0 = sin límite)."""
+
+    def __init__(self, por_segundo=0, por_minuto=0):
+        self.cubos = []
+        if por_minuto: self.cubos.append(CuboTokens(por_minuto / 60, por_minuto))
+        if por_segundo: self.cubos.append(CuboTokens(por_segundo, max(1, por_segundo)))
+
+    def esperar_turno(self):
+        for cubo in self.cubos: cubo.tomar()
+
+
+def duracion_estimada(n, por_segundo=0, por_minuto=0):
+    """Segundos que `LimiteEnvio` tarda como mínimo en dejar pasar n mensajes.
+
+    Cada cubo arranca lleno (ráfaga inicial) y luego repone a su tasa; no
+    incluye lo que tarda el servidor en aceptar cada mensaje.
+    """
+    segundos = 0
+    if por_segundo: segundos = max(segundos, (n - max(1, por_segundo)) / por_segundo)
+    if por_minuto: segundos = max(segundos, (n - por_minuto) / (por_minuto / 60))
+    return max(0, segundos)
+
+
+def conectar(host, port, seguridad, usuario=None, contrasena=None, timeout=30):
+    server = smtplib.SMTP_SSL(host, port, timeout=timeout) if seguridad == "ssl" else smtplib.SMTP(host, port, timeout=timeout)
+    if seguridad == "starttls": server.starttls()
+    server.ehlo_or_helo_if_needed()
+    # Los servidores locales de prueba no anuncian AUTH; los proveedores reales sí
+    if usuario and server.has_extn("auth"): server.login(usuario, contrasena)
+    return server
+
+
+class DespachadorCorreo:
+    """Envía mensajes en paralelo con un pool de conexiones SMTP autenticadas.
+
+    Cada hilo mantiene su propia conexión; si la sesión se cae se reconecta y
+    reintenta. El ritmo lo marca `LimiteEnvio` en lugar de una pausa fija.
+    """
+
+    def __init__(self, host, port, seguridad, usuario=None, contrasena=None,
+                 conexiones=CONEXIONES_DEFECTO, por_segundo=0, por_minuto=0):
+        self.destino = (host, port, seguridad, usuario, contrasena)
+        self.conexiones = max(1, conexiones)
+        self.limite = LimiteEnvio(por_segundo, por_minuto)
+        self._local = threading.local()
+        self._abiertas = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def para_proveedor(cls, proveedor, usuario, contrasena, **kwargs):
+        host, port, seguridad = PROVEEDORES[proveedor]
+        por_segundo, por_minuto = LIMITES[proveedor]
+        kwargs.setdefault("por_segundo", por_segundo)
+        kwargs.setdefault("por_minuto", por_minuto)
+        return cls(host, port, seguridad, usuario, contrasena, **kwargs)
+
+    def _conexion(self, nueva=False):
+        server = getattr(self._local, "server", None)
+        if server is None or nueva:
+            if server is not None: self._cerrar(server)
+            server = conectar(*self.destino)
+            self._local.server = server
+            with self._lock: self._abiertas.append(server)
+        return server
+
+    def _cerrar(self, server):
+        with self._lock:
+            if server in self._abiertas: self._abiertas.remove(server)
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    def _enviar_uno(self, msg):
+        # Los mensajes pueden llegar como funciones para armarlos ya en el hilo
+        if callable(msg): msg = msg()
+        self.limite.esperar_turno()
+        for intento in range(REINTENTOS + 1):
+            try:
+                server = self._conexion(nueva=intento > 0)
+                if isinstance(msg, MensajeCrudo): server.sendmail(msg.remitente, msg.destinatarios, msg.datos)
+                else: server.send_message(msg)
+                return
+            except Exception as e:
+                if not es_error_conexion(e):
+                    self._reiniciar_sesion()
+                    raise
+                if intento == REINTENTOS: raise
+
+    def _reiniciar_sesion(self):
+        # Un error a media transacción deja la sesión en MAIL; RSET la limpia
+        server = getattr(self._local, "server", None)
+        if server is None: return
+        try:
+            server.rset()
+        except Exception:
+            self._cerrar(server)
+            self._local.server = None
+
+    def verificar(self):
+        """Abre la primera conexión para que un error de credenciales salga de inmediato."""
+        self._conexion()
+
+    def enviar(self, mensajes):
+        """Envía todos los mensajes; produce (indice, error o None) conforme terminan.
+
+        Cada elemento puede ser un EmailMessage, un MensajeCrudo o una función
+        que construya uno de ellos.
+        Se consume desde el hilo que llama, así que ahí se puede actualizar la UI.
+        """
+        with ThreadPoolExecutor(max_workers=self.conexiones, thread_name_prefix="smtp") as ex:
+            futuros = {ex.submit(self._enviar_uno, m): i for i, m in enumerate(mensajes)}
+            for fut in as_completed(futuros):
+                yield futuros[fut], fut.exception()
+
+    def cerrar(self):
+        with self._lock: abiertas = list(self._abiertas)
+        for server in abiertas: self._cerrar(server)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
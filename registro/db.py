@@ -0,0 +1,50 @@
+"""Base SQLite compartida por la cola de envíos, el almacén de torneos y el historial de versiones."""
+import os
+import sqlite3
+import threading
+
+RUTA_DB = os.environ.get("REGISTRO_DB", "registro.sqlite3")
+
+
+class BaseDatos:
+    """Una conexión SQLite (WAL) para todo el proceso, protegida por un lock.
+
+    El lock es reentrante: quien abre una transacción lo toma y puede seguir
+    usando la misma conexión sin que otro hilo se meta entre sus sentencias.
+    """
+
+    def __init__(self, ruta=RUTA_DB):
+        self.ruta = ruta
+        self.con = sqlite3.connect(ruta, check_same_thread=False, isolation_level=None)
+        self.con.row_factory = sqlite3.Row
+        self.lock = threading.RLock()
+        with self.lock:
+            self.con.execute("PRAGMA journal_mode=WAL")
+
+    def esquema(self, script):
+        with self.lock:
+            self.con.executescript(script)
+
+
+def por_proceso(fabrica):
+    """Función que crea `fabrica()` la primera vez y después regresa siempre la misma instancia."""
+    instancias = []
+    lock = threading.Lock()
+
+    def obtener():
+        with lock:
+            if not instancias: instancias.append(fabrica())
+            return instancias[0]
+    return obtener
+
+
+_bases = {}
+_lock_bases = threading.Lock()
+
+
+def obtener_base(ruta=None):
+    """Conexión única por proceso para cada ruta (por defecto RUTA_DB)."""
+    ruta = ruta or RUTA_DB
+    with _lock_bases:
+        if ruta not in _bases: _bases[ruta] = BaseDatos(ruta)
+        return _bases[ruta]
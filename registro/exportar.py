@@ -0,0 +1,52 @@
+import tempfile
+import zipfile
+import zlib
+
+from registro.qr import iterar_imagenes
+
+# Arriba de este tamaño el ZIP se pasa de memoria a un archivo temporal en disco
+UMBRAL_MEMORIA = 8 * 1024 * 1024
+
+# Modos de compresión del ZIP. Los PNG ya vienen comprimidos con zlib, así que
+# DEFLATE casi no reduce el tamaño y sí cuesta CPU.
+MODOS_ZIP = {
+    "stored": "Sin compresión (más rápido)",
+    "auto": "Automático por archivo",
+    "deflated": "Comprimir todo (DEFLATE)",
+}
+FIRMA_PNG = b"\x89PNG\r\n\x1a\n"
+MUESTRA_AUTO = 64 * 1024
+GANANCIA_MINIMA = 0.05
+
+
+def tipo_compresion(datos, modo):
+    """Decide si una entrada se guarda tal cual o con DEFLATE."""
+    if modo == "stored": return zipfile.ZIP_STORED
+    if modo == "deflated": return zipfile.ZIP_DEFLATED
+    if datos.startswith(FIRMA_PNG): return zipfile.ZIP_STORED
+    # Medir la ganancia con una muestra barata antes de comprimir todo
+    muestra = datos[:MUESTRA_AUTO]
+    if not muestra: return zipfile.ZIP_STORED
+    ganancia = 1 - len(zlib.compress(muestra, 1)) / len(muestra)
+    return zipfile.ZIP_DEFLATED if ganancia >= GANANCIA_MINIMA else zipfile.ZIP_STORED
+
+
+def escribir_zip(equipos, progreso=None, umbral=UMBRAL_MEMORIA, modo="stored", nivel=6, perfil="original",
+                 resumen=None):
+    """Escribe el ZIP de QRs conforme se generan, en un archivo temporal.
+
+    `modo` es una llave de MODOS_ZIP, `nivel` el nivel de DEFLATE (1-9) y
+    `perfil` una llave de `registro.qr.PERFILES`; `resumen` se pasa a
+    `iterar_imagenes` para contar QRs referenciados contra renderizados.
+    Regresa el archivo (SpooledTemporaryFile) posicionado al inicio; quien lo
+    recibe debe cerrarlo.
+    """
+    archivo = tempfile.SpooledTemporaryFile(max_size=umbral, suffix=".zip")
+    with zipfile.ZipFile(archivo, "w", zipfile.ZIP_STORED) as z:
+        for eq, imgs in iterar_imagenes(equipos, progreso=progreso, perfil=perfil, resumen=resumen):
+            for nombre, png in imgs:
+                tipo = tipo_compresion(png, modo)
+                z.writestr(f"{eq['Carpeta']}/{nombre}", png, compress_type=tipo,
+                           compresslevel=nivel if tipo == zipfile.ZIP_DEFLATED else None)
+    archivo.seek(0)
+    return archivo
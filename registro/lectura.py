@@ -0,0 +1,78 @@
+import os
+
+import pandas as pd
+
+from registro.roster import COLUMNAS_USADAS
+
+# Orden de preferencia cuando el motor es "auto"
+ORDEN_AUTO = ["calamine", "openpyxl_ro", "openpyxl"]
+
+
+def _leer_calamine(archivo, columnas):
+    # Requiere python-calamine (pandas >= 2.2)
+    return pd.read_excel(archivo, engine="calamine", header=None, usecols=columnas)
+
+
+def _leer_openpyxl_ro(archivo, columnas):
+    """Lectura en modo streaming (read_only) tomando solo las columnas pedidas."""
+    import openpyxl
+
+    wb = openpyxl.load_workbook(archivo, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        ultima = max(columnas) + 1
+        filas = []
+        for fila in ws.iter_rows(max_col=ultima, values_only=True):
+            fila = tuple(fila) + (None,) * (ultima - len(fila))
+            filas.append([fila[c] for c in columnas])
+    finally:
+        wb.close()
+    return pd.DataFrame(filas, columns=columnas)
+
+
+def _leer_openpyxl(archivo, columnas):
+    # Ruta original: todo el libro con openpyxl normal
+    return pd.read_excel(archivo, engine="openpyxl", header=None)
+
+
+def _quitar_filas_finales(df, columnas):
+    """Corta las filas del final que no tienen datos en `columnas`.
+
+    Cada motor decide distinto hasta dónde llega la hoja (una nota en una
+    columna que no se usa, celdas con solo formato); sin este corte `ffill`
+    convertiría esas filas en copias del último equipo.
+    """
+    con_datos = df[[c for c in columnas if c in df.columns]].notna().any(axis=1).to_numpy().nonzero()[0]
+    return df.iloc[:con_datos[-1] + 1 if len(con_datos) else 0]
+
+
+MOTORES = {
+    "calamine": _leer_calamine,
+    "openpyxl_ro": _leer_openpyxl_ro,
+    "openpyxl": _leer_openpyxl,
+}
+
+
+def motor_defecto():
+    return os.environ.get("REGISTRO_MOTOR_EXCEL", "auto")
+
+
+def leer_excel(archivo, motor=None, columnas=COLUMNAS_USADAS):
+    """Lee la primera hoja del Excel maestro sin encabezados.
+
+    Con un motor rápido solo se leen `columnas` (conservando su índice
+    original). Si el motor no está instalado o falla, se prueba el siguiente
+    hasta llegar a la lectura original con openpyxl. Las filas vacías al final
+    se cortan igual con todos los motores. Regresa (df, motor_usado).
+    """
+    motor = motor or motor_defecto()
+    candidatos = ORDEN_AUTO if motor == "auto" else [motor, "openpyxl"]
+    columnas = sorted(set(columnas))
+    for nombre in dict.fromkeys(candidatos):
+        if hasattr(archivo, "seek"): archivo.seek(0)
+        try:
+            df = MOTORES[nombre](archivo, columnas)
+        except Exception:
+            if nombre == "openpyxl": raise
+            continue
+        return _quitar_filas_finales(df, columnas), nombre
@@ -0,0 +1,126 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:
+    # Windows: sin getrusage no hay CPU de procesos hijos
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+RUTA_LOG = os.environ.get("REGISTRO_METRICAS", "registro_metricas.jsonl")
+MAX_RECIENTES = 200
+# Cada cuánto se lee el RSS mientras corre una etapa
+INTERVALO_MUESTRA = 0.05
+
+_recientes = deque(maxlen=MAX_RECIENTES)
+_lock = threading.Lock()
+_PAGINA = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _rss_actual():
+    """RSS actual del proceso en bytes, o None si no hay forma de leerlo."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGINA
+    except (OSError, ValueError, IndexError):
+        pass
+    return psutil.Process().memory_info().rss if psutil else None
+
+
+class _MuestreoRSS(threading.Thread):
+    """Lee el RSS en segundo plano durante una etapa y guarda el máximo.
+
+    `ru_maxrss` es el pico de toda la vida del proceso y en un servidor de
+    larga duración deja de moverse; aquí se mide el pico dentro de la etapa.
+    """
+
+    def __init__(self):
+        super().__init__(daemon=True, name="metricas-rss")
+        self.inicio = self.pico = _rss_actual()
+        self._parar = threading.Event()
+
+    def run(self):
+        while not self._parar.wait(INTERVALO_MUESTRA):
+            self._muestra()
+
+    def _muestra(self):
+        rss = _rss_actual()
+        if rss is not None: self.pico = max(self.pico, rss)
+
+    def terminar(self):
+        self._parar.set()
+        self.join()
+        self._muestra()
+
+
+def _cpu_hijos():
+    # Solo cuenta procesos hijos ya terminados (p. ej. el pool de QRs al cerrarse)
+    if resource is None: return 0.0
+    uso = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return uso.ru_utime + uso.ru_stime
+
+
+def registrar(registro, ruta=None):
+    """Guarda un registro en memoria y lo agrega como línea JSON al log."""
+    with _lock:
+        _recientes.append(registro)
+        try:
+            with open(ruta or RUTA_LOG, "a", encoding="utf-8") as f:
+                f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        except OSError:
+            # Sin permiso de escritura (p. ej. en la nube) se conserva solo en memoria
+            pass
+
+
+def recientes(huella=None):
+    """Registros del proceso, del más nuevo al más viejo; opcionalmente de un solo archivo."""
+    with _lock:
+        registros = list(_recientes)
+    return [r for r in reversed(registros) if huella is None or r.get("huella") in (huella, None)]
+
+
+def _mb(n):
+    return round(n / (1024 * 1024), 1)
+
+
+@contextmanager
+def medir(etapa, **contexto):
+    """Mide una etapa: tiempo de pared, CPU, procesos hijos y memoria extra.
+
+    `cpu_hilo_s` es solo el hilo que corre la etapa; `cpu_proceso_s` incluye
+    todos los hilos del proceso (otras sesiones, envíos en segundo plano).
+    `rss_extra_mb` es el pico de RSS durante la etapa menos el RSS al empezar,
+    muestreado cada INTERVALO_MUESTRA segundos.
+    Produce el dict del registro para que la etapa agregue sus contadores
+    ("filas", "qrs", "bytes", ...). Al salir, con o sin error, se registra.
+    """
+    registro = {"etapa": etapa, **contexto}
+    muestreo = _MuestreoRSS()
+    if muestreo.inicio is not None: muestreo.start()
+    inicio, cpu_hilo, cpu, cpu_hijos = time.perf_counter(), time.thread_time(), time.process_time(), _cpu_hijos()
+    try:
+        yield registro
+    except Exception as e:
+        registro["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        registro.update(
+            ts=round(time.time(), 3),
+            pared_s=round(time.perf_counter() - inicio, 4),
+            cpu_hilo_s=round(time.thread_time() - cpu_hilo, 4),
+            cpu_proceso_s=round(time.process_time() - cpu, 4),
+            cpu_hijos_s=round(_cpu_hijos() - cpu_hijos, 4),
+        )
+        if muestreo.inicio is not None:
+            muestreo.terminar()
+            registro.update(rss_inicio_mb=_mb(muestreo.inicio), rss_extra_mb=_mb(muestreo.pico - muestreo.inicio))
+        registrar(registro)
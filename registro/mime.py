@@ -0,0 +1,115 @@
+import base64
+import hashlib
+import threading
+import uuid
+from email import policy
+from email.header import Header
+from email.message import EmailMessage, MIMEPart
+from email.utils import getaddresses, parseaddr
+
+from registro.paquetes import adjuntos_equipo
+
+CRLF = b"\r\n"
+
+
+def _codificar_adjunto(nombre, datos, maintype="image", subtype="png"):
+    """Parte MIME serializada (encabezados + base64) de un archivo adjunto."""
+    if nombre.isascii() and nombre.isprintable() and '"' not in nombre and "\\" not in nombre and len(nombre) <= 40:
+        return (f"Content-Type: {maintype}/{subtype}\r\n".encode("ascii")
+                + b"Content-Transfer-Encoding: base64\r\n"
+                b'Content-Disposition: attachment; filename="' + nombre.encode("ascii") + b'"\r\n\r\n'
+                + base64.encodebytes(datos).replace(b"\n", CRLF))
+    # Nombres raros: que el paquete email se encargue de codificarlos
+    p = MIMEPart(policy=policy.SMTP)
+    p.set_content(datos, maintype=maintype, subtype=subtype, disposition="attachment", filename=nombre)
+    return p.as_bytes()
+
+
+class MensajeCrudo:
+    """Mensaje ya serializado, listo para `SMTP.sendmail`."""
+
+    __slots__ = ("remitente", "destinatarios", "datos")
+
+    def __init__(self, remitente, destinatarios, datos):
+        self.remitente = remitente
+        self.destinatarios = destinatarios
+        self.datos = datos
+
+
+class PreparadorCorreo:
+    """Arma los correos de un envío reutilizando las partes MIME ya codificadas.
+
+    Cada adjunto se codifica en base64 una sola vez (llave: hash del archivo y
+    nombre) y el cuerpo de texto una sola vez por envío; cada mensaje solo
+    serializa sus encabezados y concatena las partes. `adjuntos` es uno de los
+    modos de `registro.paquetes.ADJUNTOS` y `perfil` una llave de
+    `registro.qr.PERFILES`.
+    """
+
+    def __init__(self, remitente, asunto_base, cuerpo, adjuntos="png", perfil="original"):
+        self.remitente = remitente
+        self.asunto_base = asunto_base
+        self.cuerpo = cuerpo
+        self.adjuntos = adjuntos
+        self.perfil = perfil
+        self.frontera = f"=_registro_{uuid.uuid4().hex}"
+        self._delimitador = f"--{self.frontera}".encode("ascii")
+        texto = MIMEPart(policy=policy.SMTP)
+        texto.set_content(cuerpo)
+        self._texto = texto.as_bytes()
+        self._partes = {}
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.codificados = 0
+
+    def parte_adjunto(self, nombre, datos, maintype="image", subtype="png"):
+        llave = (hashlib.sha256(datos).hexdigest(), nombre, subtype)
+        with self._lock:
+            parte = self._partes.get(llave)
+            if parte is not None:
+                self.aciertos += 1
+                return parte
+        parte = _codificar_adjunto(nombre, datos, maintype, subtype)
+        with self._lock:
+            self._partes.setdefault(llave, parte)
+            self.codificados += 1
+        return parte
+
+    def _encabezados(self, destinatario, asunto):
+        asunto = Header(asunto, "us-ascii" if asunto.isascii() else "utf-8", header_name="Subject")
+        return (f"Subject: {asunto.encode(linesep=CRLF.decode())}\r\n"
+                f"From: {self.remitente}\r\nTo: {destinatario}\r\nMIME-Version: 1.0\r\n"
+                f'Content-Type: multipart/mixed; boundary="{self.frontera}"\r\n').encode("ascii")
+
+    def preparar(self, eq):
+        """MensajeCrudo con los QR del coach y de los alumnos del equipo.
+
+        Las direcciones con caracteres no ASCII requieren SMTPUTF8; para esas se
+        arma un EmailMessage normal y smtplib negocia la extensión.
+        """
+        asunto = f"{self.asunto_base} - {eq['Equipo']}"
+        # Igual que EmailMessage: un salto de línea (Alt+Enter en la celda) inyectaría encabezados y destinatarios
+        if any(c in self.remitente + eq["Correo"] + asunto for c in "\r\n"):
+            raise ValueError("Header values may not contain linefeed or carriage return characters")
+        if not (self.remitente + eq["Correo"]).isascii(): return self._mensaje_completo(eq)
+        partes = [self._texto] + [self.parte_adjunto(*a) for a in adjuntos_equipo(eq, self.adjuntos, self.perfil)]
+        cuerpo = CRLF.join(self._delimitador + CRLF + p for p in partes)
+        datos = (self._encabezados(eq["Correo"], asunto) + CRLF
+                 + cuerpo + CRLF + self._delimitador + b"--" + CRLF)
+        destinatarios = [d for _, d in getaddresses([eq["Correo"]]) if d]
+        return MensajeCrudo(parseaddr(self.remitente)[1], destinatarios, datos)
+
+    def _mensaje_completo(self, eq):
+        msg = EmailMessage()
+        msg["Subject"] = f"{self.asunto_base} - {eq['Equipo']}"
+        msg["From"] = self.remitente
+        msg["To"] = eq["Correo"]
+        msg.set_content(self.cuerpo)
+        for nombre, datos, maintype, subtype in adjuntos_equipo(eq, self.adjuntos, self.perfil):
+            msg.add_attachment(datos, maintype=maintype, subtype=subtype, filename=nombre)
+        return msg
+
+    def estadisticas(self):
+        with self._lock:
+            return {"codificados": self.codificados, "aciertos": self.aciertos,
+                    "bytes": sum(len(p) for p in self._partes.values())}
@@ -0,0 +1,164 @@
+import io
+import textwrap
+import unicodedata
+import zipfile
+from functools import lru_cache
+
+from PIL import Image, ImageDraw, ImageFont
+
+from registro.qr import PERFILES, TIPOS_MIME, imagenes_equipo
+
+# Formatos de adjunto por correo: etiqueta en la UI -> modo
+ADJUNTOS = {
+    "Un PNG por persona": "png",
+    "Un ZIP por equipo": "zip",
+    "Hoja de contactos (PNG)": "hoja_png",
+    "Hoja de contactos (PDF)": "pdf",
+}
+# Cuadrícula de la hoja de contactos
+COLUMNAS_HOJA = 3
+LADO_QR = 300
+ALTO_ETIQUETA = 60
+MARGEN = 30
+ALTO_TITULO = 60
+
+
+@lru_cache(maxsize=None)
+def _fuente(tam):
+    """DejaVu si está instalada (tiene acentos); si no, la fuente de Pillow.
+
+    Regresa (fuente, acentos) donde `acentos` indica si la fuente los dibuja.
+    """
+    try:
+        return ImageFont.truetype("DejaVuSans.ttf", tam), True
+    except OSError:
+        pass
+    try:
+        return ImageFont.load_default(tam), False
+    except TypeError:
+        # Pillow < 10.1 no escala la fuente por defecto
+        return ImageFont.load_default(), False
+
+
+def _sin_acentos(txt):
+    return unicodedata.normalize("NFKD", txt).encode("ascii", "ignore").decode("ascii")
+
+
+def _nombre_archivo(eq, extension):
+    return f"{eq['Carpeta'] or eq['Equipo'] or 'equipo'}.{extension}"
+
+
+def zip_equipo(imagenes):
+    """ZIP con los QR del equipo; sin compresión porque el PNG ya está comprimido."""
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_STORED) as zf:
+        for nombre, png in imagenes: zf.writestr(nombre, png)
+    return buf.getvalue()
+
+
+def hoja_contactos(titulo, imagenes, etiquetas):
+    """Imagen en escala de grises con todos los QR del equipo y su etiqueta debajo."""
+    filas = max(1, -(-len(imagenes) // COLUMNAS_HOJA))
+    celda_alto = LADO_QR + ALTO_ETIQUETA
+    ancho = MARGEN * 2 + COLUMNAS_HOJA * LADO_QR
+    alto = MARGEN * 2 + ALTO_TITULO + filas * celda_alto
+    hoja = Image.new("L", (ancho, alto), 255)
+    dibujo = ImageDraw.Draw(hoja)
+    (fuente_titulo, acentos), (fuente, _) = _fuente(28), _fuente(16)
+    texto = (lambda t: t) if acentos else _sin_acentos
+    dibujo.text((MARGEN, MARGEN), texto(titulo), fill=0, font=fuente_titulo)
+
+    for i, ((_, png), etiqueta) in enumerate(zip(imagenes, etiquetas)):
+        x = MARGEN + (i % COLUMNAS_HOJA) * LADO_QR
+        y = MARGEN + ALTO_TITULO + (i // COLUMNAS_HOJA) * celda_alto
+        with Image.open(io.BytesIO(png)) as qr:
+            qr = qr.convert("L")
+            # Reescalar solo si no cabe, para no deformar los módulos del código
+            if qr.width > LADO_QR: qr = qr.resize((LADO_QR, LADO_QR), Image.NEAREST)
+            hoja.paste(qr, (x + (LADO_QR - qr.width) // 2, y + (LADO_QR - qr.height) // 2))
+        for j, linea in enumerate(textwrap.wrap(texto(etiqueta), 30)[:3]):
+            dibujo.text((x + LADO_QR // 2, y + LADO_QR + 2 + j * 18), linea, fill=0, font=fuente, anchor="ma")
+    return hoja
+
+
+def _hoja_equipo(eq):
+    """Hoja de contactos del equipo con el perfil original, en 1 bit por pixel.
+
+    Sin grises intermedios el PNG queda más chico y el PDF evita el JPEG.
+    """
+    etiquetas = [img.get("etiqueta") or img["name"].rsplit(".", 1)[0] for img in eq["Imagenes"]]
+    hoja = hoja_contactos(eq["Equipo"], imagenes_equipo(eq), etiquetas)
+    return hoja.point(lambda v: 255 if v > 127 else 0).convert("1")
+
+
+def agrupar_por_coach(equipos):
+    """Un destinatario por correo de coach (sin distinguir mayúsculas ni espacios).
+
+    Los coaches con un solo equipo quedan igual; los demás se juntan en un
+    registro con "Equipos" (la lista original) y los datos de todos sus QR en
+    "Imagenes", para que `adjuntos_equipo` los organice por equipo.
+    """
+    grupos = {}
+    for eq in equipos: grupos.setdefault(eq["Correo"].strip().lower(), []).append(eq)
+    return [g[0] if len(g) == 1 else {
+        "Carpeta": f"QRs {len(g)} equipos", "Equipo": ", ".join(e["Equipo"] for e in g), "Correo": g[0]["Correo"],
+        "Imagenes": [img for e in g for img in e["Imagenes"]], "Equipos": g,
+    } for g in grupos.values()]
+
+
+def adjuntos_grupo(grupo, modo="png", perfil="original"):
+    """Adjuntos de un correo agrupado por coach, organizados por equipo.
+
+    "png" antepone la carpeta del equipo a cada archivo (el QR del coach va una
+    sola vez), "zip" usa una carpeta por equipo, "hoja_png" manda una hoja por
+    equipo y "pdf" una página por equipo.
+    """
+    equipos = grupo["Equipos"]
+    if modo == "png":
+        # El QR del coach se repite en cada equipo; en un mismo correo basta una vez
+        vistos = set()
+        adjuntos = []
+        for e in equipos:
+            for nombre, *resto in adjuntos_equipo(e, modo, perfil):
+                if nombre in vistos: continue
+                vistos.add(nombre)
+                adjuntos.append((f"{e['Carpeta']} - {nombre}", *resto))
+        return adjuntos
+    if modo == "zip":
+        imagenes = [(f"{e['Carpeta']}/{nombre}", datos) for e in equipos for nombre, datos in imagenes_equipo(e, perfil)]
+        return [(_nombre_archivo(grupo, "zip"), zip_equipo(imagenes), "application", "zip")]
+    if modo == "hoja_png":
+        return [a for e in equipos for a in adjuntos_equipo(e, modo, perfil)]
+    if modo == "pdf":
+        hojas = [_hoja_equipo(e) for e in equipos]
+        buf = io.BytesIO()
+        hojas[0].save(buf, format="PDF", resolution=150, save_all=True, append_images=hojas[1:])
+        return [(_nombre_archivo(grupo, "pdf"), buf.getvalue(), "application", "pdf")]
+    raise ValueError(f"Formato de adjuntos desconocido: {modo}")
+
+
+def adjuntos_equipo(eq, modo="png", perfil="original"):
+    """Adjuntos del correo de un equipo: lista de (nombre, bytes, maintype, subtype).
+
+    "png" manda un archivo por persona (formato original); "zip" los junta en
+    un solo archivo; "hoja_png" y "pdf" arman una hoja imprimible con todos los
+    códigos y el nombre de cada persona. `perfil` aplica a los dos primeros; las
+    hojas siempre usan el perfil original, que es el tamaño de su cuadrícula.
+    Los registros de `agrupar_por_coach` se pasan a `adjuntos_grupo`.
+    """
+    if "Equipos" in eq: return adjuntos_grupo(eq, modo, perfil)
+    if modo == "png":
+        tipo = TIPOS_MIME[PERFILES[perfil]["formato"]]
+        return [(nombre, datos, *tipo) for nombre, datos in imagenes_equipo(eq, perfil)]
+    if modo == "zip":
+        return [(_nombre_archivo(eq, "zip"), zip_equipo(imagenes_equipo(eq, perfil)), "application", "zip")]
+
+    hoja = _hoja_equipo(eq)
+    buf = io.BytesIO()
+    if modo == "hoja_png":
+        hoja.save(buf, format="PNG")
+        return [(_nombre_archivo(eq, "png"), buf.getvalue(), "image", "png")]
+    if modo == "pdf":
+        hoja.save(buf, format="PDF", resolution=150)
+        return [(_nombre_archivo(eq, "pdf"), buf.getvalue(), "application", "pdf")]
+    raise ValueError(f"Formato de adjuntos desconocido: {modo}")
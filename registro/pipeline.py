@@ -0,0 +1,104 @@
+import hashlib
+import io
+import os
+import shutil
+
+from registro.almacen import obtener_almacen
+from registro.exportar import escribir_zip
+from registro.lectura import leer_excel
+from registro.metricas import medir
+from registro.reporte import escribir_excel_resumen
+from registro.roster import normalizar
+from registro.trabajos import obtener_cola
+
+ASUNTO_DEFECTO = "Accesos QR - Torneo de Robótica"
+CUERPO_DEFECTO = (
+    "Estimado Coach,\n\nAdjunto a este correo encontrará los códigos QR de acceso para los integrantes de su "
+    "equipo.\n\nEstos deberán ser presentados por sus alumnos en el momento de registrarse.\n\nFavor de "
+    "distribuirlos.\n\nEn el caso de faltar alguno o presentar problemas, por favor notificar al coordinador "
+    "del torneo.\n\nSaludos cordiales."
+)
+
+
+def cargar_dataframe(archivo, motor=None):
+    """Lee el Excel maestro, propaga las celdas combinadas y quita la fila de subtítulos."""
+    df, _ = leer_excel(archivo, motor)
+    df = df.ffill()
+    return df.iloc[1:].reset_index(drop=True)
+
+
+def huella_archivo(contenido):
+    return hashlib.sha256(contenido).hexdigest()
+
+
+def cargar_torneo(contenido, almacen=None):
+    """(huella, tablas, origen) de un Excel en bytes.
+
+    Si la huella ya está en el almacén no se vuelve a parsear; `origen` es
+    "almacen" o "archivo".
+    """
+    almacen = almacen or obtener_almacen()
+    huella = huella_archivo(contenido)
+    with medir("almacen", huella=huella, bytes=len(contenido)) as m:
+        tablas = almacen.cargar(huella)
+        m["acierto"] = tablas is not None
+        if tablas is not None: m["filas"] = len(tablas["equipos"])
+    if tablas is not None: return huella, tablas, "almacen"
+    with medir("lectura", huella=huella, bytes=len(contenido)) as m:
+        df = cargar_dataframe(io.BytesIO(contenido))
+        m["filas"] = len(df)
+    with medir("normalizacion", huella=huella, filas=len(df)) as m:
+        tablas = normalizar(df)
+        almacen.guardar(huella, tablas)
+    return huella, tablas, "archivo"
+
+
+def con_correo(equipos):
+    """Equipos con un correo de coach utilizable."""
+    return [e for e in equipos if e.get("Correo") and "@" in str(e.get("Correo"))]
+
+
+def construir_zip(equipos, destino, modo="stored", nivel=6, perfil="original", progreso=None):
+    """Escribe el ZIP de QRs en la ruta `destino`; regresa el resumen de render."""
+    resumen = {}
+    with medir("zip", filas=len(equipos), perfil=perfil, modo=modo) as m, \
+            escribir_zip(equipos, progreso=progreso, modo=modo, nivel=nivel, perfil=perfil, resumen=resumen) as zf, \
+            open(destino, "wb") as salida:
+        shutil.copyfileobj(zf, salida)
+        resumen["bytes"] = salida.tell()
+        m.update(qrs=resumen.get("renderizados", 0), bytes=resumen["bytes"])
+    return resumen
+
+
+def construir_reporte(tablas, destino):
+    """Escribe el Excel clasificado en `destino`; regresa el número de asesores."""
+    with medir("reporte", filas=len(tablas["alumnos"])) as m:
+        # Directo al archivo, sin pasar el libro completo por memoria
+        n_asesores = escribir_excel_resumen(tablas, destino)
+        m["bytes"] = os.path.getsize(destino)
+    return n_asesores
+
+
+def enviar_correos(equipos, proveedor, usuario, contrasena, asunto=ASUNTO_DEFECTO, cuerpo=CUERPO_DEFECTO,
+                   huella=None, progreso=None, intervalo=1.0, tid=None, reintentar_errores=False, **opciones):
+    """Crea (o reanuda, si se da `tid`) un trabajo de envío y espera a que termine.
+
+    El trabajo queda en la cola persistente igual que los de la app, así que se
+    puede reanudar desde cualquiera de los dos. `progreso(resumen)` se llama
+    cada `intervalo` segundos. Regresa (tid, resumen final).
+    """
+    cola = obtener_cola()
+    if tid is None: tid = cola.crear(equipos, proveedor, usuario, asunto, cuerpo, huella=huella, **opciones)
+    elif reintentar_errores: cola.reintentar(tid)
+    if not cola.iniciar(tid, contrasena):
+        raise RuntimeError(f"El envío #{tid} ya está en curso en otro proceso (pid {cola.trabajo(tid)['pid']}).")
+    try:
+        while cola.activo(tid):
+            cola.esperar(tid, intervalo)
+            if progreso: progreso(cola.resumen(tid))
+    except KeyboardInterrupt:
+        # Lo que no se alcanzó a mandar queda pendiente para reanudar después
+        cola.detener(tid)
+        cola.esperar(tid)
+        raise
+    return tid, cola.resumen(tid)
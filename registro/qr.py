@@ -0,0 +1,240 @@
+import io
+import multiprocessing
+import os
+import struct
+import zlib
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import qrcode
+from PIL import Image
+from qrcode import constants
+
+from registro.cache_qr import CacheQR, obtener_cache
+
+# Por debajo de este número de QRs pendientes no vale la pena levantar procesos
+MIN_PARALELO = 64
+TAM_LOTE = 128
+
+CORRECCION = {"L": constants.ERROR_CORRECT_L, "M": constants.ERROR_CORRECT_M,
+              "Q": constants.ERROR_CORRECT_Q, "H": constants.ERROR_CORRECT_H}
+# Perfiles de render: tamaño del módulo, margen (en módulos), corrección de errores y formato.
+# "original" produce los mismos pixeles que antes de existir los perfiles.
+PERFILES = {
+    "original": {"box_size": 10, "border": 4, "correccion": "M", "formato": "png", "optimizar": False},
+    "pantalla": {"box_size": 8, "border": 4, "correccion": "M", "formato": "png", "optimizar": True},
+    "impresion": {"box_size": 12, "border": 4, "correccion": "H", "formato": "png", "optimizar": True},
+    "correo": {"box_size": 4, "border": 4, "correccion": "M", "formato": "png", "optimizar": True},
+    "vectorial": {"box_size": 10, "border": 4, "correccion": "M", "formato": "svg", "optimizar": False},
+}
+NOMBRES_PERFIL = {
+    "original": "Original (10 px, corrección M)",
+    "pantalla": "Pantalla (8 px)",
+    "impresion": "Impresión (12 px, corrección H)",
+    "correo": "Correo (4 px, más ligero)",
+    "vectorial": "Vectorial (SVG)",
+}
+TIPOS_MIME = {"png": ("image", "png"), "svg": ("image", "svg+xml")}
+
+
+def _svg(matriz, box_size, fill_color, back_color):
+    """SVG con un solo path: cada tramo horizontal de módulos oscuros es un rectángulo."""
+    lado = len(matriz)
+    trazos = []
+    for y, fila in enumerate(matriz):
+        x = 0
+        while x < lado:
+            if not fila[x]:
+                x += 1
+                continue
+            inicio = x
+            while x < lado and fila[x]: x += 1
+            trazos.append(f"M{inicio} {y}h{x - inicio}v1h-{x - inicio}z")
+    px = lado * box_size
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{px}" height="{px}" viewBox="0 0 {lado} {lado}" '
+            f'shape-rendering="crispEdges"><rect width="{lado}" height="{lado}" fill="{back_color}"/>'
+            f'<path fill="{fill_color}" d="{"".join(trazos)}"/></svg>').encode("utf-8")
+
+
+def _chunk(tipo, datos):
+    return struct.pack(">I", len(datos)) + tipo + datos + struct.pack(">I", zlib.crc32(tipo + datos))
+
+
+def _png_1bit(matriz, box_size, nivel=6):
+    """PNG en escala de grises de 1 bit escrito directo desde la matriz de módulos.
+
+    Mismos pixeles que `make_image` (negro = módulo oscuro, incluyendo el
+    margen que ya trae la matriz) sin pasar por un objeto de PIL. Todas las
+    filas van sin filtro: cada una se repite `box_size` veces y zlib la
+    encuentra en la ventana, así que sale más chico que el filtro adaptativo.
+    """
+    modulos = np.asarray(matriz, dtype=bool)
+    pixeles = np.repeat(np.repeat(~modulos, box_size, axis=0), box_size, axis=1)
+    alto, ancho = pixeles.shape
+    filas = np.packbits(pixeles, axis=1)
+    crudo = np.hstack([np.zeros((alto, 1), np.uint8), filas]).tobytes()
+    return (b"\x89PNG\r\n\x1a\n" + _chunk(b"IHDR", struct.pack(">IIBBBBB", ancho, alto, 1, 0, 0, 0, 0))
+            + _chunk(b"IDAT", zlib.compress(crudo, nivel)) + _chunk(b"IEND", b""))
+
+
+def _png_pil(qr, fill_color, back_color, optimizar):
+    img = qr.make_image(fill_color=fill_color, back_color=back_color).get_image()
+    # Con colores distintos a blanco y negro qrcode entrega RGB; dos colores caben en una paleta
+    if img.mode not in ("1", "P"): img = img.convert("P", palette=Image.Palette.ADAPTIVE, colors=2)
+    img_byte_arr = io.BytesIO()
+    img.save(img_byte_arr, format='PNG', optimize=optimizar)
+    return img_byte_arr.getvalue()
+
+
+def _renderizar(dato, box_size, border, fill_color, back_color, correccion="M", formato="png", optimizar=False):
+    qr = qrcode.QRCode(box_size=box_size, border=border, error_correction=CORRECCION[correccion])
+    qr.add_data(dato)
+    qr.make(fit=True)
+    if formato == "svg": return _svg(qr.get_matrix(), box_size, fill_color, back_color)
+    # Blanco y negro (el caso normal) no necesita PIL; con otros colores sí
+    if (fill_color, back_color) == ("black", "white"): return _png_1bit(qr.get_matrix(), box_size, 9 if optimizar else 6)
+    return _png_pil(qr, fill_color, back_color, optimizar)
+
+
+def _renderizar_bloque(datos, opciones):
+    return [_renderizar(d, *opciones) for d in datos]
+
+
+def nombre_archivo(nombre, formato="png"):
+    """Cambia la extensión .png del nombre por la del formato del perfil."""
+    return nombre if formato == "png" else nombre.rsplit(".", 1)[0] + "." + formato
+
+
+def generar_qr_bytes(dato, box_size=10, border=4, fill_color="black", back_color="white",
+                     correccion="M", formato="png", optimizar=False, cache=None):
+    """Genera la imagen del QR, reutilizando la caché del proceso si ya existe."""
+    cache = cache or obtener_cache()
+    opciones = (box_size, border, fill_color, back_color, correccion, formato, optimizar)
+    llave = CacheQR.llave(dato, *opciones)
+    png = cache.obtener(llave)
+    if png is None:
+        png = _renderizar(dato, *opciones)
+        cache.guardar(llave, png)
+    return png
+
+
+def workers_defecto():
+    return int(os.environ.get("REGISTRO_QR_WORKERS", 0)) or os.cpu_count() or 1
+
+
+def crear_pool(workers=None):
+    """Pool de procesos para renderizar QRs.
+
+    Los procesos salen de un forkserver (o spawn donde no existe) y no de un
+    fork del servidor: con fork se copian el heap y los locks de todos los
+    hilos de Streamlit, y un lock tomado por otro hilo se queda tomado en el hijo.
+    """
+    metodo = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return ProcessPoolExecutor(max_workers=workers or workers_defecto(),
+                               mp_context=multiprocessing.get_context(metodo))
+
+
+def renderizar_lote(datos, workers=None, progreso=None, tam_lote=TAM_LOTE, box_size=10, border=4,
+                    fill_color="black", back_color="white", correccion="M", formato="png", optimizar=False,
+                    cache=None, resumen=None, pool=None):
+    """Genera las imágenes de una lista de datos repartiendo el trabajo en procesos.
+
+    Regresa los bytes en el mismo orden de `datos`. `progreso(hechos, total)` se
+    llama al terminar cada lote. Si se pasa el dict `resumen`, se le suman los
+    datos distintos que se renderizaron ("renderizados") y los que salieron de
+    la caché ("desde_cache"). Con `pool` (de `crear_pool`) se reutilizan sus
+    procesos; si no, se levanta uno solo para esta llamada.
+    """
+    cache = cache or obtener_cache()
+    workers = workers or workers_defecto()
+    opciones = (box_size, border, fill_color, back_color, correccion, formato, optimizar)
+
+    # Primero lo que ya está en caché; solo se renderizan los datos únicos faltantes
+    resultado = {}
+    pendientes = []
+    for d in dict.fromkeys(datos):
+        png = cache.obtener(CacheQR.llave(d, *opciones))
+        if png is None: pendientes.append(d)
+        else: resultado[d] = png
+
+    total = len(pendientes)
+    if resumen is not None:
+        resumen["renderizados"] = resumen.get("renderizados", 0) + total
+        resumen["desde_cache"] = resumen.get("desde_cache", 0) + len(resultado)
+    lotes = [pendientes[i:i + tam_lote] for i in range(0, total, tam_lote)]
+    hechos = 0
+
+    def recibir(lote, pngs):
+        nonlocal hechos
+        for d, png in zip(lote, pngs):
+            cache.guardar(CacheQR.llave(d, *opciones), png)
+            resultado[d] = png
+        hechos += len(lote)
+        if progreso: progreso(hechos, total)
+
+    if total < MIN_PARALELO or (pool is None and workers <= 1):
+        for lote in lotes: recibir(lote, _renderizar_bloque(lote, opciones))
+    else:
+        propio = crear_pool(min(workers, len(lotes))) if pool is None else None
+        try:
+            ex = pool or propio
+            futuros = {ex.submit(_renderizar_bloque, lote, opciones): lote for lote in lotes}
+            for fut in as_completed(futuros):
+                recibir(futuros[fut], fut.result())
+        finally:
+            if propio: propio.shutdown()
+
+    return [resultado[d] for d in datos]
+
+
+def imagenes_equipo(equipo, perfil="original"):
+    """Lista de (nombre, imagen) de un equipo, generada al momento con el perfil dado."""
+    opciones = PERFILES[perfil]
+    return [(nombre_archivo(img["name"], opciones["formato"]), generar_qr_bytes(img["dato"], **opciones))
+            for img in equipo["Imagenes"]]
+
+
+def contar_datos(equipos):
+    """(referencias, distintos): QRs que piden los equipos y datos únicos entre ellos.
+
+    Un coach con varios equipos (o una celda combinada que `ffill` repite)
+    aparece muchas veces pero se renderiza una sola.
+    """
+    conteo = Counter(img["dato"] for e in equipos for img in e["Imagenes"])
+    return sum(conteo.values()), len(conteo)
+
+
+def iterar_imagenes(equipos, tam_bloque=200, workers=None, progreso=None, perfil="original", resumen=None):
+    """Recorre los equipos en bloques, generando sus QRs justo antes de usarlos.
+
+    Produce (equipo, [(nombre, imagen), ...]). Primero se cuentan las
+    referencias de cada dato en todo el torneo: cada dato se renderiza una sola
+    vez y sus bytes se conservan solo mientras algún equipo posterior los
+    necesite, así que la memoria no crece con el tamaño del torneo. `resumen`
+    recibe "referencias" y "distintos" además de lo que llena `renderizar_lote`.
+    """
+    opciones = PERFILES[perfil]
+    workers = workers or workers_defecto()
+    restantes = Counter(img["dato"] for e in equipos for img in e["Imagenes"])
+    if resumen is not None: resumen.update(referencias=sum(restantes.values()), distintos=len(restantes))
+    compartidos = {}
+    total = len(equipos)
+    # Un solo pool para toda la exportación; sus procesos arrancan hasta el primer bloque que los use
+    pool = crear_pool(workers) if workers > 1 else None
+    try:
+        for inicio in range(0, total, tam_bloque):
+            bloque = equipos[inicio:inicio + tam_bloque]
+            faltan = [d for d in dict.fromkeys(img["dato"] for e in bloque for img in e["Imagenes"])
+                      if d not in compartidos]
+            compartidos.update(zip(faltan, renderizar_lote(faltan, resumen=resumen, pool=pool, **opciones)))
+            for e in bloque:
+                imgs = []
+                for img in e["Imagenes"]:
+                    imgs.append((nombre_archivo(img["name"], opciones["formato"]), compartidos[img["dato"]]))
+                    restantes[img["dato"]] -= 1
+                    if not restantes[img["dato"]]: del compartidos[img["dato"]]
+                yield e, imgs
+            if progreso: progreso(min(inicio + tam_bloque, total), total)
+    finally:
+        if pool: pool.shutdown()
@@ -0,0 +1,57 @@
+import tempfile
+
+import xlsxwriter
+
+HOJAS_CATEGORIA = {"Línea": 4, "Laberinto": 4, "Escenario": 5}
+COLS_ASESOR = ["Escuela", "Nombre", "Ap. Paterno", "Ap. Materno", "Celular", "Correo"]
+HEADERS_AL = ["Escuela", "Equipo", "Categoría", "Matrícula", "Ap. Paterno", "Ap. Materno", "Nombre", "Correo Inst."]
+
+
+def contar_asesores(tablas):
+    """Asesores únicos por (nombre, celular), sin generar el reporte."""
+    return len(tablas["asesores"])
+
+
+def escribir_excel_resumen(tablas, salida):
+    """Escribe el reporte clasificado en `salida` (ruta o archivo binario); regresa el número de asesores.
+
+    Con `constant_memory` xlsxwriter vuelca cada fila a un temporal en disco al
+    pasar a la siguiente, así que la memoria no crece con el número de alumnos.
+    A cambio las filas deben escribirse en orden y hoja por hoja.
+    """
+    workbook = xlsxwriter.Workbook(salida, {'constant_memory': True})
+    header_fmt = workbook.add_format({'bold': True, 'bg_color': '#D3D3D3', 'border': 1})
+
+    # 1. ASESORES
+    cols = ["escuela", "nombre", "ap_paterno", "ap_materno", "celular", "correo"]
+    _escribir_hoja(workbook, "Asesores", COLS_ASESOR, tablas["asesores"][cols], header_fmt)
+
+    # 2. ALUMNOS (TRANSPOSICIÓN): la tabla larga ya viene despivotada y en orden;
+    # se reparte por hoja una sola vez en lugar de filtrar todo por cada una
+    alumnos = tablas["alumnos"]
+    cols = ["escuela", "equipo", "categoria_reporte", "matricula", "ap_paterno", "ap_materno", "nombre", "correo"]
+    por_hoja = dict(tuple(alumnos.groupby("categoria_reporte", sort=False)))
+    for hoja, maximo in HOJAS_CATEGORIA.items():
+        sel = por_hoja.get(hoja, alumnos.iloc[:0])
+        _escribir_hoja(workbook, hoja, HEADERS_AL, sel.loc[sel["slot"] < maximo, cols], header_fmt)
+
+    workbook.close()
+    return contar_asesores(tablas)
+
+
+def _escribir_hoja(workbook, nombre, encabezados, tabla, header_fmt):
+    sheet = workbook.add_worksheet(nombre)
+    sheet.write_row(0, 0, encabezados, header_fmt)
+    for r, fila in enumerate(tabla.to_numpy(object).tolist(), start=1):
+        sheet.write_row(r, 0, fila)
+
+
+def generar_excel_resumen(tablas):
+    """Reporte clasificado en bytes: hoja de asesores y una hoja vertical por categoría.
+
+    Se arma en un archivo temporal y solo al final se lee completo.
+    """
+    with tempfile.TemporaryFile(suffix=".xlsx") as archivo:
+        n_asesores = escribir_excel_resumen(tablas, archivo)
+        archivo.seek(0)
+        return archivo.read(), n_asesores
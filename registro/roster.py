@@ -0,0 +1,129 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# Posiciones fijas del Excel maestro (índice de columna, base 0)
+COL_ESCUELA, COL_EQUIPO, COL_CATEGORIA = 1, 3, 4
+COLS_COACH = {"nombre": 5, "ap_paterno": 6, "ap_materno": 7, "celular": 8, "correo": 9}
+# Bloques de alumno: matrícula, ap. paterno, ap. materno, nombre, correo
+CONFIG_POS = [[10, 11, 12, 13, 16], [17, 18, 19, 20, 23], [24, 25, 26, 27, 30],
+              [31, 32, 33, 34, 37], [39, 40, 41, 42, 45]]
+CAMPOS_ALUMNO = ["matricula", "ap_paterno", "ap_materno", "nombre", "correo"]
+COLS_MAT = [b[0] for b in CONFIG_POS]
+# Todas las columnas que usa el pipeline, en el orden en que se limpian
+COLUMNAS_USADAS = [COL_ESCUELA, COL_EQUIPO, COL_CATEGORIA, *COLS_COACH.values(), *[c for b in CONFIG_POS for c in b]]
+
+
+def limpiar_dato(dato):
+    if pd.isna(dato): return ""
+    txt = str(dato).strip()
+    return txt[:-2] if txt.endswith(".0") else txt
+
+
+def limpiar_columnas(df, columnas):
+    """Versión vectorizada de `limpiar_dato` para varias columnas a la vez.
+
+    Las columnas que no existen en el archivo se regresan vacías.
+    """
+    sub = df.reindex(columns=columnas)
+    txt = sub.astype(object).astype(str).where(sub.notna(), "")
+    return txt.apply(lambda s: s.str.strip().str.replace(r"\.0$", "", regex=True))
+
+
+# Igual que conservar c.isalnum() o " -_" y cambiar lo demás por "-"
+_NO_PERMITIDO_CARPETA = re.compile(r"[^\w \-]")
+
+
+def nombre_carpeta(esc, eq, cat):
+    return _NO_PERMITIDO_CARPETA.sub("-", f"{esc} {eq} {cat}".strip())
+
+
+def categoria_reporte(cat):
+    """Hoja del reporte que corresponde a la categoría (vacío si ninguna)."""
+    cat = cat.str.lower()
+    return pd.Series(
+        pd.NA, index=cat.index, dtype=object
+    ).mask(cat.str.contains("escenario", regex=False), "Escenario") \
+     .mask(cat.str.contains("laberinto", regex=False), "Laberinto") \
+     .mask(cat.str.contains("línea", regex=False) | cat.str.contains("linea", regex=False), "Línea") \
+     .fillna("")
+
+
+def normalizar(df):
+    """Limpia una sola vez las columnas usadas y arma las tablas del torneo.
+
+    Regresa {"equipos", "asesores", "alumnos"}; ver `despivotar_alumnos`.
+    """
+    limpio = limpiar_columnas(df, COLUMNAS_USADAS)
+    limpio.index = pd.RangeIndex(len(limpio), name="fila")
+
+    coach = limpio[list(COLS_COACH.values())].set_axis(list(COLS_COACH), axis=1)
+    coach.insert(0, "escuela", limpio[COL_ESCUELA])
+    asesores = coach[coach["nombre"] != ""].drop_duplicates(["nombre", "celular"]).reset_index(drop=True)
+
+    equipos = pd.DataFrame({
+        "escuela": limpio[COL_ESCUELA],
+        "equipo": limpio[COL_EQUIPO],
+        "categoria": limpio[COL_CATEGORIA],
+        "celular_coach": coach["celular"],
+        "correo_coach": coach["correo"],
+        "nombre_coach": (coach["nombre"] + " " + coach["ap_paterno"] + " " + coach["ap_materno"]).str.strip(),
+    })
+    equipos = equipos[(equipos["escuela"] != "") & (equipos["equipo"] != "")].copy()
+    equipos["carpeta"] = [nombre_carpeta(*t) for t in zip(equipos["escuela"], equipos["equipo"], equipos["categoria"])]
+    equipos["categoria_reporte"] = categoria_reporte(equipos["categoria"])
+    equipos["limite_qr"] = equipos["categoria"].str.lower().str.contains("escenario", regex=False).map({True: 5, False: 4})
+
+    alumnos = despivotar_alumnos(limpio.loc[equipos.index], equipos)
+
+    return {"equipos": equipos, "asesores": asesores, "alumnos": alumnos}
+
+
+def despivotar_alumnos(limpio, equipos):
+    """Convierte los 5 bloques horizontales de alumnos en una tabla larga.
+
+    Todos los bloques se reacomodan en una sola operación sobre el arreglo
+    (equipos x lugar x campo) y el límite de lugares por categoría se aplica
+    como máscara. Cada alumno conserva la fila de su equipo y su lugar (0-4).
+    """
+    n_lugares, n_campos = len(CONFIG_POS), len(CAMPOS_ALUMNO)
+    valores = limpio[[c for b in CONFIG_POS for c in b]].to_numpy(object)
+    largo = valores.reshape(len(limpio) * n_lugares, n_campos)
+    filas = np.repeat(limpio.index.to_numpy(), n_lugares)
+    lugares = np.tile(np.arange(n_lugares), len(limpio))
+
+    mascara = (largo[:, 0] != "") & (lugares < np.repeat(equipos["limite_qr"].to_numpy(), n_lugares))
+    alumnos = pd.DataFrame(largo[mascara], columns=CAMPOS_ALUMNO)
+    alumnos.insert(0, "slot", lugares[mascara])
+    alumnos.insert(0, "fila", filas[mascara])
+    datos_equipo = equipos[["escuela", "equipo", "categoria_reporte"]].to_numpy(object)
+    posiciones = equipos.index.get_indexer(alumnos["fila"])
+    for i, col in enumerate(["escuela", "equipo", "categoria_reporte"]):
+        alumnos[col] = datos_equipo[posiciones, i]
+    return alumnos
+
+
+def leer_equipos(tablas):
+    """Extrae los equipos con los datos a codificar, sin generar imágenes.
+
+    Cada imagen es {"name", "dato", "etiqueta"}; los bytes se generan al
+    exportar o enviar. La etiqueta es el nombre de la persona, para las hojas
+    de contactos.
+    """
+    equipos = tablas["equipos"]
+    alumnos = tablas["alumnos"]
+    nombres = (alumnos["nombre"] + " " + alumnos["ap_paterno"] + " " + alumnos["ap_materno"]).str.strip()
+    por_fila = {}
+    for fila, mat, nombre in zip(alumnos["fila"], alumnos["matricula"], nombres):
+        por_fila.setdefault(fila, []).append({"name": f"Alumno_{mat}.png", "dato": mat, "etiqueta": nombre or mat})
+
+    resultado = []
+    for fila, eq in zip(equipos.index, equipos.itertuples(index=False)):
+        imgs = []
+        if eq.celular_coach:
+            imgs.append({"name": f"Coach_{eq.celular_coach}.png", "dato": eq.celular_coach,
+                         "etiqueta": f"Coach: {eq.nombre_coach or eq.celular_coach}"})
+        imgs.extend(por_fila.get(fila, []))
+        resultado.append({"Carpeta": eq.carpeta, "Equipo": eq.equipo, "Correo": eq.correo_coach, "Imagenes": imgs})
+    return resultado
@@ -0,0 +1,245 @@
+import json
+import os
+import threading
+import time
+from functools import partial
+
+from registro.correo import DespachadorCorreo
+from registro.db import obtener_base, por_proceso
+from registro.metricas import medir
+from registro.mime import PreparadorCorreo
+
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS trabajos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    creado REAL NOT NULL,
+    huella TEXT,
+    proveedor TEXT NOT NULL,
+    usuario TEXT NOT NULL,
+    asunto TEXT NOT NULL,
+    cuerpo TEXT NOT NULL,
+    opciones TEXT NOT NULL DEFAULT '{}',
+    estado TEXT NOT NULL DEFAULT 'nuevo',
+    pid INTEGER,
+    mensaje TEXT
+);
+CREATE TABLE IF NOT EXISTS envios (
+    trabajo_id INTEGER NOT NULL REFERENCES trabajos(id),
+    indice INTEGER NOT NULL,
+    equipo TEXT NOT NULL,
+    correo TEXT NOT NULL,
+    datos TEXT NOT NULL,
+    estado TEXT NOT NULL DEFAULT 'pendiente',
+    intentos INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    actualizado REAL,
+    PRIMARY KEY (trabajo_id, indice)
+);
+CREATE INDEX IF NOT EXISTS envios_estado ON envios (trabajo_id, estado);
+"""
+
+# Estados de cada destinatario:
+#   pendiente -> enviando -> enviado | error
+#   "incierto": quedó en "enviando" cuando el proceso murió; no se reenvía solo
+#   para no mandar el correo dos veces.
+ESTADOS_ENVIO = ["pendiente", "enviando", "enviado", "error", "incierto"]
+
+
+class EnvioCancelado(Exception):
+    """El destinatario no se envió en esta corrida: se pidió detener o lo tomó otro proceso."""
+
+
+def _proceso_vivo(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _en_otro_proceso(t):
+    return t["estado"] == "en_curso" and bool(t["pid"]) and t["pid"] != os.getpid() and _proceso_vivo(t["pid"])
+
+
+class ColaEnvios:
+    """Trabajos de envío masivo persistidos en SQLite y ejecutados en segundo plano.
+
+    El estado de cada destinatario se guarda antes y después de enviarle, así
+    un trabajo interrumpido se puede reanudar sin repetir correos.
+    """
+
+    def __init__(self, ruta=None):
+        base = obtener_base(ruta)
+        self.ruta = base.ruta
+        self._con, self._lock = base.con, base.lock
+        self._hilos = {}
+        self._paradas = {}
+        base.esquema(ESQUEMA)
+        self._recuperar_interrumpidos()
+
+    def _sql(self, consulta, parametros=()):
+        with self._lock:
+            return self._con.execute(consulta, parametros).fetchall()
+
+    def _cambiar(self, consulta, parametros=()):
+        """Ejecuta un UPDATE y regresa cuántas filas cambió."""
+        with self._lock:
+            return self._con.execute(consulta, parametros).rowcount
+
+    def _recuperar_interrumpidos(self):
+        """Marca como interrumpidos los trabajos cuyo proceso ya no existe."""
+        for t in self._sql("SELECT id, pid FROM trabajos WHERE estado = 'en_curso'"):
+            if t["pid"] == os.getpid() or (t["pid"] and _proceso_vivo(t["pid"])): continue
+            self._sql("UPDATE envios SET estado = 'incierto' WHERE trabajo_id = ? AND estado = 'enviando'", (t["id"],))
+            self._sql("UPDATE trabajos SET estado = 'interrumpido' WHERE id = ?", (t["id"],))
+
+    def crear(self, equipos, proveedor, usuario, asunto, cuerpo, huella=None, **opciones):
+        """Registra un trabajo nuevo con un destinatario por equipo."""
+        with self._lock:
+            cur = self._con.cursor()
+            cur.execute("BEGIN")
+            try:
+                cur.execute(
+                    "INSERT INTO trabajos (creado, huella, proveedor, usuario, asunto, cuerpo, opciones) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (time.time(), huella, proveedor, usuario, asunto, cuerpo, json.dumps(opciones)))
+                tid = cur.lastrowid
+                cur.executemany(
+                    "INSERT INTO envios (trabajo_id, indice, equipo, correo, datos) VALUES (?, ?, ?, ?, ?)",
+                    [(tid, i, eq["Equipo"], eq["Correo"], json.dumps(eq, ensure_ascii=False)) for i, eq in enumerate(equipos)])
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+            cur.execute("COMMIT")
+        return tid
+
+    def trabajo(self, tid):
+        filas = self._sql("SELECT * FROM trabajos WHERE id = ?", (tid,))
+        return dict(filas[0]) if filas else None
+
+    def ultimo(self, huella=None):
+        if huella is None: filas = self._sql("SELECT id FROM trabajos ORDER BY id DESC LIMIT 1")
+        else: filas = self._sql("SELECT id FROM trabajos WHERE huella = ? ORDER BY id DESC LIMIT 1", (huella,))
+        return filas[0]["id"] if filas else None
+
+    def propio(self, tid):
+        """True si el trabajo corre en un hilo de esta cola."""
+        hilo = self._hilos.get(tid)
+        return hilo is not None and hilo.is_alive()
+
+    def activo(self, tid):
+        """True si el trabajo corre aquí o en otro proceso vivo (p. ej. la línea de comandos)."""
+        return self.propio(tid) or _en_otro_proceso(self.trabajo(tid))
+
+    def resumen(self, tid):
+        conteo = {e: 0 for e in ESTADOS_ENVIO}
+        for f in self._sql("SELECT estado, COUNT(*) AS n FROM envios WHERE trabajo_id = ? GROUP BY estado", (tid,)):
+            conteo[f["estado"]] = f["n"]
+        t = self.trabajo(tid)
+        return {"estado": t["estado"], "mensaje": t["mensaje"], "activo": self.propio(tid) or _en_otro_proceso(t),
+                "propio": self.propio(tid), "pid": t["pid"], "total": sum(conteo.values()), **conteo}
+
+    def envios(self, tid, estado):
+        return [dict(f) for f in self._sql(
+            "SELECT indice, equipo, correo, error FROM envios WHERE trabajo_id = ? AND estado = ? ORDER BY indice",
+            (tid, estado))]
+
+    def reintentar(self, tid, estados=("error",)):
+        """Regresa a pendiente los destinatarios en `estados` (p. ej. errores o inciertos)."""
+        marcas = ",".join("?" * len(estados))
+        self._sql(f"UPDATE envios SET estado = 'pendiente' WHERE trabajo_id = ? AND estado IN ({marcas})",
+                  (tid, *estados))
+
+    def _marcar(self, tid, indice, estado, error=None):
+        self._sql("UPDATE envios SET estado = ?, error = ?, actualizado = ?, "
+                  "intentos = intentos + (? = 'enviando') WHERE trabajo_id = ? AND indice = ?",
+                  (estado, error, time.time(), estado, tid, indice))
+
+    def _reclamar(self, tid):
+        """Marca el trabajo en curso con el pid de este proceso, si nadie más lo tiene.
+
+        El UPDATE solo aplica si el estado y el pid siguen siendo los que se
+        leyeron, así que de dos procesos que reanudan a la vez solo uno gana.
+        """
+        with self._lock:
+            t = self.trabajo(tid)
+            if self.propio(tid) or _en_otro_proceso(t): return False
+            if not self._cambiar("UPDATE trabajos SET estado = 'en_curso', pid = ?, mensaje = NULL "
+                                 "WHERE id = ? AND estado = ? AND pid IS ?", (os.getpid(), tid, t["estado"], t["pid"])):
+                return False
+            if t["estado"] == "en_curso":
+                # El dueño anterior murió a medio envío
+                self._sql("UPDATE envios SET estado = 'incierto' WHERE trabajo_id = ? AND estado = 'enviando'", (tid,))
+        return True
+
+    def iniciar(self, tid, contrasena):
+        """Arranca (o reanuda) el trabajo en un hilo; solo envía a los pendientes.
+
+        Regresa False sin hacer nada si el trabajo ya corre aquí o en otro proceso.
+        """
+        if not self._reclamar(tid): return False
+        parar = threading.Event()
+        self._paradas[tid] = parar
+        hilo = threading.Thread(target=self._ejecutar, args=(tid, contrasena, parar), daemon=True,
+                                name=f"envio-{tid}")
+        self._hilos[tid] = hilo
+        hilo.start()
+        return True
+
+    def detener(self, tid):
+        parar = self._paradas.get(tid)
+        if parar: parar.set()
+
+    def esperar(self, tid, timeout=None):
+        hilo = self._hilos.get(tid)
+        if hilo: hilo.join(timeout)
+
+    def _preparar(self, tid, preparador, fila, parar):
+        if parar.is_set(): raise EnvioCancelado()
+        # Se toma el destinatario antes de enviarle; si ya no está pendiente, otro proceso lo tiene
+        if not self._cambiar("UPDATE envios SET estado = 'enviando', actualizado = ?, intentos = intentos + 1 "
+                             "WHERE trabajo_id = ? AND indice = ? AND estado = 'pendiente'",
+                             (time.time(), tid, fila["indice"])):
+            raise EnvioCancelado()
+        return preparador.preparar(json.loads(fila["datos"]))
+
+    def _ejecutar(self, tid, contrasena, parar):
+        t = self.trabajo(tid)
+        pendientes = [dict(f) for f in self._sql(
+            "SELECT indice, datos FROM envios WHERE trabajo_id = ? AND estado = 'pendiente' ORDER BY indice", (tid,))]
+        with medir("envio", huella=t["huella"], trabajo=tid, filas=len(pendientes)) as m:
+            preparador = None
+            enviados = errores = 0
+            try:
+                opciones = json.loads(t["opciones"])
+                adjuntos = opciones.pop("adjuntos", "png")
+                perfil = opciones.pop("perfil", "original")
+                despachador = DespachadorCorreo.para_proveedor(t["proveedor"], t["usuario"], contrasena, **opciones)
+                with despachador:
+                    despachador.verificar()
+                    # Los adjuntos se codifican una vez por corrida y se reutilizan en reintentos
+                    preparador = PreparadorCorreo(t["usuario"], t["asunto"], t["cuerpo"], adjuntos, perfil)
+                    tareas = [partial(self._preparar, tid, preparador, fila, parar) for fila in pendientes]
+                    for i, error in despachador.enviar(tareas):
+                        # Los cancelados siguen pendientes (o en manos de otro proceso)
+                        if isinstance(error, EnvioCancelado): continue
+                        self._marcar(tid, pendientes[i]["indice"], "error" if error else "enviado",
+                                     str(error) if error else None)
+                        if error: errores += 1
+                        else: enviados += 1
+                estado, mensaje = ("detenido" if parar.is_set() else "terminado"), None
+            except Exception as e:
+                estado, mensaje = "error", str(e)
+            self._sql("UPDATE trabajos SET estado = ?, mensaje = ? WHERE id = ?", (estado, mensaje, tid))
+            m.update(enviados=enviados, errores=errores, estado=estado)
+            if mensaje: m["error"] = mensaje
+            if preparador:
+                stats = preparador.estadisticas()
+                m.update(qrs=stats["codificados"], bytes=stats["bytes"])
+
+
+# Cola única por proceso, compartida por todas las sesiones
+obtener_cola = por_proceso(ColaEnvios)
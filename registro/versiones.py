@@ -0,0 +1,100 @@
+import hashlib
+import json
+import time
+
+from registro.db import obtener_base, por_proceso
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS versiones (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    creado REAL NOT NULL,
+    huella TEXT NOT NULL,
+    equipos TEXT NOT NULL
+);
+"""
+
+
+def huella_equipo(eq):
+    """Hash del contenido de un equipo: correo, nombre y cada QR con su etiqueta."""
+    return hashlib.sha256(json.dumps(eq, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+
+
+def llaves_equipos(equipos):
+    """Identidad de cada equipo entre versiones: su carpeta (escuela, equipo y
+    categoría). Si se repite en el mismo archivo se numera en orden de aparición."""
+    vistos = {}
+    llaves = []
+    for eq in equipos:
+        n = vistos[eq["Carpeta"]] = vistos.get(eq["Carpeta"], 0) + 1
+        llaves.append(eq["Carpeta"] if n == 1 else f"{eq['Carpeta']} #{n}")
+    return llaves
+
+
+def huellas_equipos(equipos):
+    return dict(zip(llaves_equipos(equipos), map(huella_equipo, equipos)))
+
+
+def comparar(anterior, equipos):
+    """Diferencias entre las huellas de la versión anterior y los equipos nuevos.
+
+    Regresa {"agregados", "modificados", "eliminados"} con las llaves de cada
+    grupo, "sin_cambio" (cuántos) y "cambiados": los equipos nuevos o
+    modificados, en el orden del archivo.
+    """
+    actuales = huellas_equipos(equipos)
+    agregados = [k for k in actuales if k not in anterior]
+    modificados = [k for k, h in actuales.items() if k in anterior and anterior[k] != h]
+    eliminados = [k for k in anterior if k not in actuales]
+    tocados = set(agregados) | set(modificados)
+    return {
+        "agregados": agregados, "modificados": modificados, "eliminados": eliminados,
+        "sin_cambio": len(actuales) - len(tocados),
+        "cambiados": [eq for k, eq in zip(actuales, equipos) if k in tocados],
+    }
+
+
+class HistorialVersiones:
+    """Huellas por equipo de cada archivo cargado, para comparar revisiones.
+
+    Comparte la base SQLite de la cola de envíos, así la versión anterior se
+    conoce aunque la haya subido otra sesión u otro día.
+    """
+
+    def __init__(self, ruta=None):
+        base = obtener_base(ruta)
+        self._con, self._lock = base.con, base.lock
+        base.esquema(ESQUEMA)
+
+    def _sql(self, consulta, parametros=()):
+        with self._lock:
+            return self._con.execute(consulta, parametros).fetchall()
+
+    def registrar(self, huella, equipos):
+        """Guarda la versión si no es la misma que la última cargada; regresa su id."""
+        ultima = self._sql("SELECT id, huella FROM versiones ORDER BY id DESC LIMIT 1")
+        if ultima and ultima[0]["huella"] == huella: return ultima[0]["id"]
+        with self._lock:
+            cur = self._con.execute("INSERT INTO versiones (creado, huella, equipos) VALUES (?, ?, ?)",
+                                    (time.time(), huella, json.dumps(huellas_equipos(equipos))))
+            return cur.lastrowid
+
+    def anterior(self, huella):
+        """La versión cargada justo antes de la más reciente con esta huella (o None)."""
+        filas = self._sql(
+            "SELECT id, creado, huella, equipos FROM versiones WHERE huella != ? AND id < "
+            "(SELECT MAX(id) FROM versiones WHERE huella = ?) ORDER BY id DESC LIMIT 1", (huella, huella))
+        if not filas: return None
+        v = dict(filas[0])
+        v["equipos"] = json.loads(v["equipos"])
+        return v
+
+    def cambios(self, huella, equipos):
+        """Registra la versión y la compara contra la anterior; None si es la primera."""
+        self.registrar(huella, equipos)
+        previa = self.anterior(huella)
+        if previa is None: return None
+        return {"anterior": previa["huella"], "creado": previa["creado"], **comparar(previa["equipos"], equipos)}
+
+
+# Historial único por proceso, compartido por todas las sesiones
+obtener_historial = por_proceso(HistorialVersiones)